@@ -1,43 +1,40 @@
 import pandas as pd
 import sqlite3 as sql
 
-conn = sql.connect('vacancy_db')
+from vacancy_db import create_summary_tables, db_name
+
+conn = sql.connect(db_name)
 pd.set_option('expand_frame_repr', False)
+create_summary_tables(conn, 'vacancies')
 vac_name = input('Введите название вакансии: ')
-salary_by_year = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-            round(avg(salary)) as avg_salary 
-                        from vacancies
-                        group by year""", conn)
-count_by_year = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-                count(salary) as count
-                        from vacancies
-                        group by year """, conn)
-salary_by_year_with_vac = pd.read_sql(f"""select STRFTIME('%Y', date || '-01') AS 'year',
+salary_by_year = pd.read_sql("""select year,
+            round(salary_sum / salary_count) as avg_salary
+                        from year_stats
+                        order by year""", conn)
+count_by_year = pd.read_sql("""select year,
+                salary_count as count
+                        from year_stats
+                        order by year""", conn)
+salary_by_year_with_vac = pd.read_sql("""select year,
                 round(avg(salary)) as avg_salary
                         from vacancies
-                        where name like '%{vac_name}%'
-                        group by year""", conn)
-count_by_year_with_vac = pd.read_sql(f"""select STRFTIME('%Y', date || '-01') AS 'year',
+                        where name like ?
+                        group by year""", conn, params=(f'%{vac_name}%',))
+count_by_year_with_vac = pd.read_sql("""select year,
                 count(salary) as count
                         from vacancies
-                        where name like '%{vac_name}%'
-                        group by year""", conn)
+                        where name like ?
+                        group by year""", conn, params=(f'%{vac_name}%',))
 
-salary_by_city = pd.read_sql("""select area_name, avg from
-                        (select area_name, round(avg(salary)) as avg,
-                         count(salary) as count
-                        from vacancies
-                        group by area_name
-                        order by avg desc)
-                    where count > (select count(*) from vacancies) * 0.01
+salary_by_city = pd.read_sql("""select area_name, round(salary_sum / salary_count) as avg
+                        from city_stats
+                        where salary_count > (select sum(rows_count) from city_stats) * 0.01
+                        order by avg desc
                     limit 10""", conn)
 count_by_city = pd.read_sql("""select area_name,
-                        round(cast(count as real) / (select count(*) from vacancies), 4)
-                         as percent from
-                        (select area_name, count(salary) as count
-                        from vacancies
-                        group by area_name
-                        order by count desc)
+                        round(cast(salary_count as real) / (select sum(rows_count) from city_stats), 4) as percent
+                        from city_stats
+                        order by salary_count desc
                         limit 10""", conn)
 
 print('Динамика уровня зарплат по годам \n', salary_by_year)
@@ -1,33 +1,45 @@
+import os
+
 import pandas as pd
 import sqlite3 as sql
 
+from currency_convert import convert_salary, daily_store_name, load_daily_rates, read_currency_table
+from vacancy_db import db_name, load_csv
+
 
-def apply_to_currency(row: pd.Series) -> int or None:
-    """ конверсирует salary в рубли по актуальному курсу(на момент публикации) из таблицы currencies
+def is_complete(df: pd.DataFrame) -> pd.Series:
+    """ отмечает полные вакансии части csv файла: с названием, валютой, городом, датой публикации
+     и хотя бы одной границей оклада. Неполные вакансии не загружаются никогда
 
     Args:
-        row: строка DataFrame
+        df: часть csv файла
 
-    Returns: заначение salary в рублях
+    Returns: булева маска полных вакансий
 
     """
-    if row['salary_currency'] == 'RUR':
-        return round(row['salary'])
-    cur.execute(f"""SELECT * FROM currencies WHERE DATE = '{row['date']}'""")
-    valutes = dict(zip([col[0] for col in cur.description], cur.fetchone()))
-    if row['salary_currency'] not in valutes or valutes[row['salary_currency']] is None:
-        return None
-    return round(row['salary'] * valutes[row['salary_currency']])
-
-
-df = pd.read_csv('vacancies_dif_currencies.csv')
-df = df.dropna(subset=['name', 'salary_currency', 'area_name', 'published_at']) \
-    .dropna(subset=['salary_from', 'salary_to'], how='all').reset_index(drop=True)
-con = sql.connect('vacancy_db')
-cur = con.cursor()
-
-df['date'] = df['published_at'].str[:7]
-df['salary'] = df[['salary_from', 'salary_to']].mean(axis=1)
-df['salary'] = df.apply(axis=1, func=apply_to_currency)
-df = df[['name', 'salary', 'area_name', 'date']].dropna()
-df.to_sql('vacancies', con=con, index=True, if_exists='append')
\ No newline at end of file
+    return df[['name', 'salary_currency', 'area_name', 'published_at']].notna().all(axis=1) \
+        & df[['salary_from', 'salary_to']].notna().any(axis=1)
+
+
+def prepare_vacancies(df: pd.DataFrame) -> pd.DataFrame:
+    """ конверсирует salary полных вакансий части csv файла в рубли
+     по актуальному курсу(на момент публикации): дневному из currencies_daily.csv, если он есть,
+     иначе месячному из таблицы currencies. Вакансии без курса отбрасываются до следующей загрузки
+
+    Args:
+        df: полные вакансии части csv файла
+
+    Returns: вакансии со столбцами name, salary, area_name, date
+
+    """
+    df = df.copy()
+    df['date'] = df['published_at'].str[:7]
+    df['salary'] = df[['salary_from', 'salary_to']].mean(axis=1)
+    df['salary'] = convert_salary(df, currency_data, daily_rates=daily_rates).round()
+    return df[['name', 'salary', 'area_name', 'date']].dropna()
+
+
+con = sql.connect(db_name)
+currency_data = read_currency_table(con)
+daily_rates = load_daily_rates(daily_store_name) if os.path.exists(daily_store_name) else None
+load_csv('vacancies_dif_currencies.csv', con, 'vacancies', prepare_vacancies, keep_rows=is_complete)
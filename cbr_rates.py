@@ -0,0 +1,180 @@
+import io
+import os
+import sqlite3 as sql
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from currency_convert import daily_store_name, load_currency_table, load_daily_rates
+from hh_client import HHClient
+from vacancy_db import db_name
+
+default_cbr_url = os.environ.get('CBR_URL', 'http://www.cbr.ru')
+store_name = 'currencies.csv'
+first_month = '2003-01'
+first_day = '2003-01-01'
+char_code_aliases = {'BYN': 'BYR'}
+currency_ids = {'USD': ('R01235',), 'EUR': ('R01239',), 'KZT': ('R01335',), 'UAH': ('R01720',),
+                'BYR': ('R01090', 'R01090B')}
+
+
+def get_month_range(start: str, end: str) -> List[str]:
+    """Возвращает месяцы гггг-мм от start до end включительно
+
+    >>> get_month_range('2003-11', '2004-02')
+    ['2003-11', '2003-12', '2004-01', '2004-02']
+    """
+    return [str(period) for period in pd.period_range(start, end, freq='M')]
+
+
+def parse_daily_rates(content: bytes, currencies: Iterable[str]) -> Dict[str, float]:
+    """Потоково разбирает ответ XML_daily.asp ЦБ РФ и возвращает курсы нужных валют в рублях за единицу.
+     BYN записывается как BYR (char_code_aliases), курсы валют с одинаковым кодом складываются
+
+    Args:
+        content (bytes): тело ответа XML_daily.asp
+        currencies (Iterable[str]): коды нужных валют
+
+    Returns:
+        Dict[str, float]: курсы валют
+    """
+    currencies, rates = set(currencies), {}
+    for _, element in ElementTree.iterparse(io.BytesIO(content)):
+        if element.tag != 'Valute':
+            continue
+        code = element.findtext('CharCode')
+        code = char_code_aliases.get(code, code)
+        if code in currencies:
+            value = float(element.findtext('Value').replace(',', '.')) / int(element.findtext('Nominal'))
+            rates[code] = rates.get(code, 0) + value
+        element.clear()
+    return rates
+
+
+def fetch_month(client: HHClient, month: str, currencies: Iterable[str]) -> Dict[str, float]:
+    """Загружает курсы валют на первое число месяца гггг-мм"""
+    year, month_number = month.split('-')
+    content = client.get_content('/scripts/XML_daily.asp', {'date_req': f'01/{month_number}/{year}'})
+    return parse_daily_rates(content, currencies)
+
+
+def sync_rates(file_name: str = store_name, end: Optional[str] = None, start: str = first_month,
+               currencies: Optional[List[str]] = None, client: Optional[HHClient] = None) -> pd.DataFrame:
+    """Дополняет хранилище курсов (csv файл месяц x валюта) недостающими месяцами: загружаются только месяцы,
+     которых ещё нет в файле, параллельно, через один пул соединений
+
+    Args:
+        file_name (str): файл хранилища курсов, его читают task_3_3_2, 3.5.1 и currency_convert
+        end (str): последний месяц гггг-мм, по умолчанию текущий
+        start (str): первый месяц гггг-мм
+        currencies (List[str]): коды валют, по умолчанию валюты, для которых в хранилище уже есть курсы
+        client (HHClient): клиент с адресом ЦБ РФ, по умолчанию HHClient(default_cbr_url)
+
+    Returns:
+        pd.DataFrame: курсы валют с индексом date
+    """
+    store = load_currency_table(file_name) if os.path.exists(file_name) \
+        else pd.DataFrame(columns=currencies or [], index=pd.Index([], name='date'), dtype=float)
+    if currencies is None:
+        currencies = [currency for currency in store.columns if store[currency].notna().any()]
+    missing = [month for month in get_month_range(start, end or date.today().strftime('%Y-%m'))
+               if month not in store.index]
+    if missing:
+        own_client = client is None
+        client = client or HHClient(default_cbr_url)
+        rates = client.map(lambda month: fetch_month(client, month, currencies), missing)
+        if own_client:
+            client.close()
+        columns = list(store.columns) + [currency for currency in currencies if currency not in store.columns]
+        new = pd.DataFrame(rates, index=pd.Index(missing, name='date')).reindex(columns=columns)
+        store = pd.concat([store, new]).sort_index()
+        store.to_csv(file_name)
+    print(f'Курсы валют: загружено месяцев {len(missing)}, всего {len(store)}')
+    return store
+
+
+def parse_dynamic_rates(content: bytes) -> Dict[str, float]:
+    """Потоково разбирает ответ XML_dynamic.asp ЦБ РФ (курсы одной валюты за период)
+
+    Args:
+        content (bytes): тело ответа XML_dynamic.asp
+
+    Returns:
+        Dict[str, float]: курс в рублях за единицу валюты для каждой даты гггг-мм-дд
+    """
+    rates = {}
+    for _, element in ElementTree.iterparse(io.BytesIO(content)):
+        if element.tag != 'Record':
+            continue
+        day, month, year = element.get('Date').split('.')
+        rates[f'{year}-{month}-{day}'] = float(element.findtext('Value').replace(',', '.')) / \
+            int(element.findtext('Nominal'))
+        element.clear()
+    return rates
+
+
+def fetch_currency_days(client: HHClient, currency: str, date_from: pd.Timestamp,
+                        date_to: pd.Timestamp) -> Dict[str, float]:
+    """Загружает дневные курсы одной валюты за период, курсы BYR и BYN (currency_ids) складываются"""
+    rates = {}
+    for currency_id in currency_ids[currency]:
+        content = client.get_content('/scripts/XML_dynamic.asp', {'date_req1': date_from.strftime('%d/%m/%Y'),
+                                                                  'date_req2': date_to.strftime('%d/%m/%Y'),
+                                                                  'VAL_NM_RQ': currency_id})
+        for day, rate in parse_dynamic_rates(content).items():
+            rates[day] = rates.get(day, 0) + rate
+    return rates
+
+
+def sync_daily_rates(file_name: str = daily_store_name, end: Optional[str] = None, start: str = first_day,
+                     currencies: Optional[List[str]] = None, client: Optional[HHClient] = None) -> pd.DataFrame:
+    """Дополняет хранилище дневных курсов (csv файл дата x валюта): для каждой валюты одним запросом
+     XML_dynamic.asp загружаются только дни после последнего сохранённого курса, валюты загружаются параллельно
+
+    Args:
+        file_name (str): файл хранилища дневных курсов, его читает currency_convert.load_daily_rates
+        end (str): последний день гггг-мм-дд, по умолчанию сегодня
+        start (str): первый день гггг-мм-дд для валют, которых ещё нет в хранилище
+        currencies (List[str]): коды валют из currency_ids, по умолчанию все
+        client (HHClient): клиент с адресом ЦБ РФ, по умолчанию HHClient(default_cbr_url)
+
+    Returns:
+        pd.DataFrame: дневные курсы валют с индексом date
+    """
+    store = load_daily_rates(file_name) if os.path.exists(file_name) \
+        else pd.DataFrame(index=pd.DatetimeIndex([], name='date'), dtype=float)
+    end_date = pd.Timestamp(end or date.today())
+    tasks = []
+    for currency in currencies or list(currency_ids):
+        last_day = store[currency].last_valid_index() if currency in store else None
+        date_from = last_day + pd.Timedelta(days=1) if last_day is not None else pd.Timestamp(start)
+        if date_from <= end_date:
+            tasks.append((currency, date_from, end_date))
+    if tasks:
+        own_client = client is None
+        client = client or HHClient(default_cbr_url)
+        results = client.map(lambda task: fetch_currency_days(client, *task), tasks)
+        if own_client:
+            client.close()
+        new = pd.DataFrame({currency: pd.Series(rates, dtype=float)
+                            for (currency, _, _), rates in zip(tasks, results)})
+        new.index = pd.to_datetime(new.index)
+        store = new.combine_first(store).sort_index().rename_axis('date')
+        store.to_csv(file_name, date_format='%Y-%m-%d')
+    print(f'Дневные курсы валют: обновлено валют {len(tasks)}, дней {len(store)}')
+    return store
+
+
+def write_currency_table(con: sql.Connection, store: pd.DataFrame) -> None:
+    """Перезаписывает таблицу currencies базы данных курсами из хранилища"""
+    store.to_sql('currencies', con, if_exists='replace', index=True, index_label='date')
+
+
+if __name__ == '__main__':
+    rates_store = sync_rates(end=sys.argv[1] if len(sys.argv) > 1 else None)
+    sync_daily_rates()
+    with sql.connect(db_name) as connection:
+        write_currency_table(connection, rates_store)
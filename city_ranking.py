@@ -0,0 +1,65 @@
+import heapq
+from operator import itemgetter
+from typing import Dict, Optional, Tuple
+
+min_city_share = 0.01
+top_cities_count = 10
+
+
+def get_min_city_count(vacancies_count: int, min_share: float = min_city_share) -> int:
+    """Возвращает минимальное количество вакансий города, чтобы он попал в статистику по городам
+
+    >>> get_min_city_count(1250)
+    12
+    """
+    return int(vacancies_count * min_share)
+
+
+def get_needed_cities(count_by_city: Dict[str, int], vacancies_count: int) -> Dict[str, int]:
+    """Оставляет города, в которых не меньше 1% от всех вакансий; порог считается один раз, а не для каждого города
+
+    Args:
+        count_by_city (Dict[str, int]): количество вакансий по городам
+        vacancies_count (int): количество всех вакансий
+
+    Returns:
+        Dict[str, int]: количество вакансий по подходящим городам
+    """
+    min_count = get_min_city_count(vacancies_count)
+    return {city: count for city, count in count_by_city.items() if count >= min_count}
+
+
+def get_top(values: Dict, k: int = top_cities_count) -> Dict:
+    """Возвращает k наибольших значений в порядке убывания через heapq.nlargest, без сортировки всех значений.
+     Порядок при равных значениях тот же, что у sorted(..., reverse=True)[:k]
+
+    >>> get_top({'Москва': 0.3, 'Казань': 0.1, 'Пермь': 0.2}, 2)
+    {'Москва': 0.3, 'Пермь': 0.2}
+    """
+    return dict(heapq.nlargest(k, values.items(), key=itemgetter(1)))
+
+
+def rank_cities(count_by_city: Dict[str, int], salary_sum_by_city: Dict[str, float], vacancies_count: int,
+                salary_count_by_city: Optional[Dict[str, int]] = None,
+                k: int = top_cities_count) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """Считает уровень зарплат и долю вакансий по городам с не меньше 1% вакансий и оставляет k первых
+
+    Args:
+        count_by_city (Dict[str, int]): количество вакансий по городам
+        salary_sum_by_city (Dict[str, float]): сумма зарплат в рублях по городам
+        vacancies_count (int): количество всех вакансий
+        salary_count_by_city (Dict[str, int]): количество вакансий с известной зарплатой по городам,
+         по умолчанию count_by_city
+        k (int): количество городов в каждой статистике
+
+    Returns:
+        Tuple[Dict[str, int], Dict[str, float]]: уровень зарплат и доля вакансий по городам, в порядке убывания
+    """
+    salary_count_by_city = count_by_city if salary_count_by_city is None else salary_count_by_city
+    needed_cities = get_needed_cities(count_by_city, vacancies_count)
+    salary_by_city = {}
+    for city in needed_cities:
+        salary_count = salary_count_by_city.get(city, 0)
+        salary_by_city[city] = 0 if salary_count == 0 else int(salary_sum_by_city[city] // salary_count)
+    pers_by_city = {city: round(count / vacancies_count, 4) for city, count in needed_cities.items()}
+    return get_top(salary_by_city, k), get_top(pers_by_city, k)
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+
+from csv_chunks import read_header
+
+cache_version = 1
+
+
+def get_cache_dir(file_name: str) -> str:
+    """Возвращает папку кэша, которая лежит рядом с csv файлом: <file_name>.cache"""
+    return f'{file_name}.cache'
+
+
+def get_source_key(file_name: str) -> dict:
+    """Ключ актуальности кэша: размер и время изменения csv файла"""
+    stat = os.stat(file_name)
+    return {'version': cache_version, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def is_valid(file_name: str, kind: str) -> bool:
+    """Проверяет, что кэш вида kind ('columns', 'frame' или 'rows') есть и построен по текущей версии csv файла
+
+    Args:
+        file_name (str): название файла csv
+        kind (str): вид кэша
+
+    Returns:
+        bool: True, если кэш можно использовать
+    """
+    meta_name = os.path.join(get_cache_dir(file_name), f'{kind}.json')
+    if not os.path.exists(meta_name) or not os.path.exists(file_name):
+        return False
+    with open(meta_name, encoding='utf-8') as file:
+        return json.load(file) == get_source_key(file_name)
+
+
+def invalidate(file_name: str, kind: str) -> None:
+    """Удаляет ключ актуальности кэша вида kind, чтобы недописанный кэш не был прочитан"""
+    meta_name = os.path.join(get_cache_dir(file_name), f'{kind}.json')
+    if os.path.exists(meta_name):
+        os.remove(meta_name)
+
+
+def mark_valid(file_name: str, kind: str) -> None:
+    """Записывает ключ актуальности после того, как кэш вида kind полностью записан"""
+    with open(os.path.join(get_cache_dir(file_name), f'{kind}.json'), 'w', encoding='utf-8') as file:
+        json.dump(get_source_key(file_name), file)
+
+
+def load_columns(file_name: str):
+    """Возвращает колоночное хранилище statistics.VacancyColumns из кэша
+
+    Args:
+        file_name (str): название файла csv
+
+    Returns:
+        VacancyColumns or None: хранилище с массивами в mmap или None, если кэш устарел
+    """
+    if not is_valid(file_name, 'columns'):
+        return None
+    from statistics import VacancyColumns
+    return VacancyColumns.load(os.path.join(get_cache_dir(file_name), 'columns'))
+
+
+def read_csv_cached(file_name: str, **read_csv_args):
+    """Замена pd.read_csv: читает DataFrame из кэша Feather (через mmap), если он актуален, иначе csv файл.
+     Аргументы read_csv_args используются только при чтении csv
+
+    Args:
+        file_name (str): название файла csv
+
+    Returns:
+        pd.DataFrame: данные файла
+    """
+    import pandas as pd
+    if is_valid(file_name, 'frame'):
+        try:
+            from pyarrow import feather
+        except ImportError:
+            return pd.read_csv(file_name, **read_csv_args)
+        return feather.read_table(os.path.join(get_cache_dir(file_name), 'frame.feather'),
+                                  memory_map=True).to_pandas()
+    return pd.read_csv(file_name, **read_csv_args)
+
+
+def read_rows_cached(file_name: str):
+    """Возвращает строки csv файла из кэша Feather в виде строк, как их отдаёт csv.reader.
+     Кэш строк хранит исходные строки без разбора пропусков и типов ('NA' и '65000' остаются как есть)
+
+    Args:
+        file_name (str): название файла csv
+
+    Returns:
+        Tuple[List[str], List[List[str]]] or None: заголовок и строки или None, если кэш устарел
+    """
+    if not is_valid(file_name, 'rows'):
+        return None
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return None
+    df = feather.read_table(os.path.join(get_cache_dir(file_name), 'rows.feather'), memory_map=True).to_pandas()
+    return list(df.columns), df.values.tolist()
+
+
+def convert(file_name: str) -> None:
+    """Строит кэш для csv файла: колоночное хранилище для statistics.py (если в файле есть нужные поля),
+     Feather без сжатия для загрузчиков на pandas и Feather с исходными строками для table.py
+     (если установлен pyarrow)
+
+    Args:
+        file_name (str): название файла csv
+    """
+    from statistics import DataSet
+    cache_dir = get_cache_dir(file_name)
+    os.makedirs(cache_dir, exist_ok=True)
+    for kind in ('columns', 'frame', 'rows'):
+        invalidate(file_name, kind)
+    statistic_fields = {'name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'}
+    built = []
+    if statistic_fields.issubset(read_header(file_name)):
+        DataSet(file_name, stream=True).to_columns().save(os.path.join(cache_dir, 'columns'))
+        built.append('columns')
+    try:
+        from pyarrow import feather
+    except ImportError:
+        print('pyarrow не установлен, кэш для pandas не создан')
+    else:
+        import pandas as pd
+        df = pd.read_csv(file_name, low_memory=False, on_bad_lines='skip')
+        feather.write_feather(df, os.path.join(cache_dir, 'frame.feather'), compression='uncompressed')
+        del df
+        rows = pd.read_csv(file_name, dtype=str, keep_default_na=False, na_filter=False, on_bad_lines='skip')
+        feather.write_feather(rows, os.path.join(cache_dir, 'rows.feather'), compression='uncompressed')
+        built += ['frame', 'rows']
+    # кэш помечается актуальным только после того, как построены все его части
+    for kind in built:
+        mark_valid(file_name, kind)
+
+if __name__ == '__main__':
+    for csv_name in sys.argv[1:]:
+        convert(csv_name)
+        print(f'Кэш для {csv_name} записан в {get_cache_dir(csv_name)}')
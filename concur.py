@@ -1,59 +1,31 @@
 import os
 from cProfile import Profile
-from functools import partial
 from multiprocessing import Pool
 from pstats import Stats
 import concurrent.futures as cf
 
-from statistics import get_all_stat, Report
+from csv_chunks import split_tasks
+from statistics import get_partial_stat, merge_partial_stats, Report
 prof = Profile()
 prof.disable()
 
-def get_stat(file_name, prof_name):
-    salary_by_year, count_by_year,salary_by_year_vac,count_by_year_vac,salary_by_city,pers_by_city = get_all_stat(file_name, prof_name)
-    return {"salary_by_year": salary_by_year,
-            'count_by_year': count_by_year,
-            'salary_by_year_vac': salary_by_year_vac,
-            'count_by_year_vac': count_by_year_vac,
-            "salary_by_city": salary_by_city,'pers_by_city':pers_by_city}
-
-def update_dict(orig, dicts, by: str):
-    for dict in dicts:
-        orig.update(dict[by].items())
-
 if __name__ == "__main__":
-    prof.enable()
-    files = []
     prof.disable()
-    csvs_dir = input('Абсолютный путь csv чанков:')
-    csvs_dir = "C:\\Users\\anony\Balaba\csv_by_years" if (csvs_dir == "") else csvs_dir
+    csv_path = input('Абсолютный путь csv файла или папки с csv чанками:')
+    csv_path = "C:\\Users\\anony\Balaba\csv_by_years" if (csv_path == "") else csv_path
     prof_name = input('Профессия: ')
     prof_name = "Программист" if (prof_name == "") else prof_name
     prof.enable()
-    path_to_csv = os.path.join('.', csvs_dir)
-    for file in os.listdir(path_to_csv):
-        files.append(os.path.join(path_to_csv, file))
+    tasks = split_tasks(os.path.join('.', csv_path), (os.cpu_count() or 1) * 4)
     with cf.ProcessPoolExecutor() as executor:
-        reader = partial(get_stat, prof_name=prof_name)
-        futures = [executor.submit(reader, file_name) for file_name in files]
+        futures = [executor.submit(get_partial_stat, file_name, prof_name, byte_range)
+                   for file_name, byte_range in tasks]
         output = []
     for future in cf.as_completed(futures, timeout=None):
         output.append(future.result())
-    salary_by_year = {}
-    update_dict(salary_by_year, output, 'salary_by_year')
-    vacs_by_year = {}
-    prof_salary_by_year = {}
-    prof_vacs_by_year = {}
-    update_dict(vacs_by_year, output, 'count_by_year')
-    update_dict(prof_vacs_by_year, output, 'count_by_year_vac')
-    update_dict(prof_salary_by_year, output, 'salary_by_year_vac')
-    salary_by_city = {}
-    pers_by_city = {}
-    update_dict(salary_by_city, output, 'salary_by_city')
-    update_dict(pers_by_city, output, 'pers_by_city')
-    report = Report(salary_by_year=salary_by_year, count_by_year=vacs_by_year,
-                    salary_by_year_vac= prof_salary_by_year, count_by_year_vac=prof_vacs_by_year,
-                    salary_by_city=salary_by_city, pers_by_city=pers_by_city,  vac=prof_name)
+    stat = merge_partial_stats(output, prof_name)
+    stat.print_statistic()
+    report = Report.from_accumulator(stat, vac=prof_name)
     report.generate_exel()
     report.generate_image()
     report.generate_pdf()
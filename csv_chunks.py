@@ -0,0 +1,118 @@
+import csv
+import os
+from typing import Iterator, List, Optional, Tuple
+
+block_size = 1 << 20
+
+
+def split_byte_ranges(file_name: str, parts: int) -> List[Tuple[int, int]]:
+    """Делит csv файл на parts примерно равных диапазонов байт, границы которых совпадают с границами записей.
+     Перевод строки внутри кавычек (многострочное описание вакансии) границей не считается:
+     чётность количества кавычек от начала файла показывает, находится ли позиция внутри поля в кавычках.
+     Заголовок в диапазоны не входит, его читает read_header
+
+    Args:
+        file_name (str): название файла csv
+        parts (int): желаемое количество диапазонов
+
+    Returns:
+        List[Tuple[int, int]]: диапазоны [начало, конец) в байтах, пустые диапазоны отброшены
+    """
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as file:
+        boundaries = find_record_boundaries(file, [0])
+        data_start = boundaries[0]
+        targets = [data_start + (size - data_start) * i // parts for i in range(1, parts)]
+        file.seek(0)
+        boundaries = [data_start] + find_record_boundaries(file, targets) + [size]
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def find_record_boundaries(file, targets: List[int]) -> List[int]:
+    """Для каждой позиции из targets (по возрастанию) находит начало первой записи не раньше неё
+
+    Args:
+        file (BinaryIO): файл, открытый в бинарном режиме и установленный на начало
+        targets (List[int]): позиции в байтах
+
+    Returns:
+        List[int]: позиции начала записей, конец файла если записи после позиции нет
+    """
+    boundaries = []
+    targets = iter(targets)
+    target = next(targets, None)
+    block_start, quotes = 0, 0
+    while target is not None:
+        block = file.read(block_size)
+        if not block:
+            break
+        search_from = max(target - block_start, 0)
+        while target is not None and search_from < len(block):
+            newline = block.find(b'\n', search_from)
+            if newline == -1:
+                break
+            if (quotes + block.count(b'"', 0, newline)) % 2 == 0:
+                boundaries.append(block_start + newline + 1)
+                target = next(targets, None)
+                while target is not None and target <= boundaries[-1]:
+                    boundaries.append(boundaries[-1])
+                    target = next(targets, None)
+                search_from = newline + 1 if target is None else max(target - block_start, newline + 1)
+            else:
+                search_from = newline + 1
+        quotes += block.count(b'"')
+        block_start += len(block)
+    end = file.seek(0, os.SEEK_END)
+    while target is not None:
+        boundaries.append(end)
+        target = next(targets, None)
+    return boundaries
+
+
+def read_header(file_name: str) -> List[str]:
+    """Возвращает заголовок csv файла"""
+    with open(file_name, encoding='utf_8_sig', newline='') as file:
+        return next(csv.reader(file), [])
+
+
+def iter_range_lines(file_name: str, start: int, end: int) -> Iterator[str]:
+    """Лениво возвращает строки файла из диапазона байт [start, end)
+
+    Args:
+        file_name (str): название файла csv
+        start (int): начало диапазона, граница записи
+        end (int): конец диапазона, граница записи
+
+    Returns:
+        Iterator[str]: строки файла вместе с переводами строк, для csv.reader
+    """
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            line = file.readline()
+            if not line:
+                return
+            position += len(line)
+            yield line.decode('utf_8')
+
+
+def iter_range_rows(file_name: str, start: int, end: int) -> Iterator[List[str]]:
+    """Лениво возвращает записи csv из диапазона байт [start, end)"""
+    return csv.reader(iter_range_lines(file_name, start, end))
+
+
+def split_tasks(path: str, parts: int) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+    """Формирует задания для процессов: один csv файл делится на parts диапазонов байт,
+     для папки с заранее разбитыми чанками каждое задание - целый файл
+
+    Args:
+        path (str): путь к csv файлу или к папке с csv чанками
+        parts (int): количество диапазонов для одного файла
+
+    Returns:
+        List[Tuple[str, Tuple[int, int] or None]]: пары (название файла, диапазон байт или None)
+    """
+    if os.path.isdir(path):
+        return [(os.path.join(path, file), None) for file in os.listdir(path)]
+    return [(path, byte_range) for byte_range in split_byte_ranges(path, parts)]
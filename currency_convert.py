@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+daily_store_name = 'currencies_daily.csv'
+
+
+def load_currency_table(file_name: str = 'currencies.csv') -> pd.DataFrame:
+    """Загружает таблицу курсов валют: строка - месяц гггг-мм, столбец - валюта
+
+    Args:
+        file_name (str): название файла csv с курсами
+
+    Returns:
+        pd.DataFrame: курсы валют с индексом date
+    """
+    return pd.read_csv(file_name).set_index('date')
+
+
+def load_daily_rates(file_name: str = daily_store_name) -> pd.DataFrame:
+    """Загружает дневные курсы валют: строка - дата установки курса гггг-мм-дд, столбец - валюта
+
+    Args:
+        file_name (str): название файла csv с дневными курсами
+
+    Returns:
+        pd.DataFrame: курсы валют с индексом date типа datetime64, пустые значения - курс не устанавливался
+    """
+    return pd.read_csv(file_name, index_col='date', parse_dates=['date']).sort_index()
+
+
+def read_currency_table(con) -> pd.DataFrame:
+    """Загружает таблицу currencies (месяц x валюта, несколько сотен строк) из базы данных одним запросом
+
+    Args:
+        con (sqlite3.Connection): соединение с базой данных
+
+    Returns:
+        pd.DataFrame: курсы валют с индексом date
+    """
+    return pd.read_sql('SELECT * FROM currencies', con, index_col='date')
+
+
+def melt_rates(currency_data: pd.DataFrame) -> pd.Series:
+    """Переводит таблицу курсов месяц x валюта в длинный вид (месяц, валюта) -> курс
+
+    Args:
+        currency_data (pd.DataFrame): курсы валют с индексом date
+
+    Returns:
+        pd.Series: курсы с индексом (date, salary_currency), пустые курсы отброшены
+    """
+    rates = currency_data.rename_axis('date').reset_index() \
+        .melt(id_vars='date', var_name='salary_currency', value_name='rate').dropna(subset=['rate'])
+    return rates.set_index(['date', 'salary_currency'])['rate'].astype(float)
+
+
+def get_rates_asof(daily_rates: pd.DataFrame, currencies, dates) -> np.ndarray:
+    """Для каждой вакансии находит последний курс её валюты, установленный не позже даты публикации.
+     Для каждой валюты даты курсов отсортированы, позиции всех вакансий ищутся одним np.searchsorted
+
+    Args:
+        daily_rates (pd.DataFrame): дневные курсы валют с индексом date типа datetime64
+        currencies (Iterable[str]): валюты вакансий
+        dates (Iterable[datetime64]): даты публикации вакансий, NaT - дата неизвестна
+
+    Returns:
+        np.ndarray: курсы, NaN если курса нет
+    """
+    currencies = np.asarray(currencies, dtype=object)
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    result = np.full(len(dates), np.nan)
+    for currency in daily_rates.columns:
+        mask = (currencies == currency) & ~np.isnat(dates)
+        rates = daily_rates[currency].dropna()
+        if rates.empty or not mask.any():
+            continue
+        positions = np.searchsorted(rates.index.values.astype('datetime64[ns]'), dates[mask], side='right') - 1
+        result[mask] = np.where(positions >= 0, rates.to_numpy(dtype=float)[np.maximum(positions, 0)], np.nan)
+    return result
+
+
+def convert_salary(df: pd.DataFrame, currency_data: pd.DataFrame, salary: str = 'salary',
+                   daily_rates: pd.DataFrame = None) -> pd.Series:
+    """Переводит столбец зарплат в рубли одной векторной операцией: по курсу месяца публикации
+     или, если переданы дневные курсы, по последнему курсу на дату публикации (get_rates_asof).
+     Зарплаты в RUR и пустые зарплаты не меняются, для валют без курса результат NaN
+
+    Args:
+        df (pd.DataFrame): вакансии со столбцами salary, salary_currency и date (гггг-мм)
+            или published_at для дневных курсов
+        currency_data (pd.DataFrame): курсы валют с индексом date, не используется при дневных курсах
+        salary (str): название столбца зарплаты
+        daily_rates (pd.DataFrame): дневные курсы валют (load_daily_rates) или None
+
+    Returns:
+        pd.Series: зарплаты в рублях с тем же индексом, что и df
+    """
+    if daily_rates is None:
+        keys = pd.MultiIndex.from_arrays([df['date'], df['salary_currency']])
+        rates = melt_rates(currency_data).reindex(keys).to_numpy()
+    else:
+        dates = pd.to_datetime(df['published_at'].str[:10], format='%Y-%m-%d', errors='coerce')
+        rates = get_rates_asof(daily_rates, df['salary_currency'], dates)
+    keep = (df['salary_currency'] == 'RUR').to_numpy() | df[salary].isna().to_numpy()
+    result = df[salary].where(keep, df[salary].to_numpy() * rates)
+    missing = int((~keep & pd.isna(rates)).sum())
+    if missing:
+        print(f'Нет курса валюты для {missing} вакансий, зарплата не указана')
+    return result
@@ -0,0 +1,94 @@
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+published_at_format = re.compile(r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})([+-])(\d{2}):?(\d{2})')
+
+
+@lru_cache(maxsize=None)
+def get_timezone(sign: str, hours: str, minutes: str) -> timezone:
+    """Возвращает объект часового пояса для смещения, один на каждое встреченное смещение"""
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    return timezone(-offset if sign == '-' else offset)
+
+
+@lru_cache(maxsize=2 ** 16)
+def parse_published_at(published_at: str) -> datetime:
+    """Разбирает дату публикации hh.ru в формате %Y-%m-%dT%H:%M:%S%z без datetime.strptime.
+     Результат кэшируется для каждой встреченной строки
+
+    Args:
+        published_at (str): дата публикации, например '2007-12-04T11:27:27+0300'
+
+    Returns:
+        datetime: дата публикации с часовым поясом
+
+    >>> parse_published_at('2007-12-04T11:27:27+0300')
+    datetime.datetime(2007, 12, 4, 11, 27, 27, tzinfo=datetime.timezone(datetime.timedelta(seconds=10800)))
+    """
+    match = published_at_format.fullmatch(published_at)
+    if match is None:
+        raise ValueError(f"time data '{published_at}' does not match format '%Y-%m-%dT%H:%M:%S%z'")
+    year, month, day, hour, minute, second, sign, offset_hours, offset_minutes = match.groups()
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                    tzinfo=get_timezone(sign, offset_hours, offset_minutes))
+
+
+def get_year(published_at: str) -> int:
+    """Возвращает год публикации
+
+    >>> get_year('2008-12-04T11:27:27+0300')
+    2008
+    """
+    return parse_published_at(published_at).year
+
+
+def get_month(published_at: str) -> str:
+    """Возвращает месяц публикации в формате гггг-мм, как в currencies.csv
+
+    >>> get_month('2008-02-04T11:27:27+0300')
+    '2008-02'
+    """
+    return parse_published_at(published_at).strftime('%Y-%m')
+
+
+def get_date(published_at: str) -> str:
+    """Возвращает дату публикации в формате дд.мм.гггг
+
+    >>> get_date('2008-02-04T11:27:27+0300')
+    '04.02.2008'
+    """
+    return parse_published_at(published_at).strftime('%d.%m.%Y')
+
+
+def get_years(published_at):
+    """Векторный аналог get_year для столбца pandas: проверяет формат и берёт год срезом строки
+
+    Args:
+        published_at (pd.Series): столбец дат публикации
+
+    Returns:
+        pd.Series: годы публикации, int
+    """
+    check_format(published_at)
+    return published_at.str.slice(0, 4).astype(int)
+
+
+def get_months(published_at):
+    """Векторный аналог get_month для столбца pandas
+
+    Args:
+        published_at (pd.Series): столбец дат публикации
+
+    Returns:
+        pd.Series: месяцы публикации в формате гггг-мм
+    """
+    check_format(published_at)
+    return published_at.str.slice(0, 7)
+
+
+def check_format(published_at) -> None:
+    """Проверяет, что все даты столбца pandas в формате hh.ru, иначе выбрасывает ValueError"""
+    invalid = ~published_at.str.fullmatch(published_at_format.pattern, na=False)
+    if invalid.any():
+        raise ValueError(f"time data '{published_at[invalid].iloc[0]}' does not match format '%Y-%m-%dT%H:%M:%S%z'")
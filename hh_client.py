@@ -0,0 +1,170 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import HTTPCache
+
+default_base_url = os.environ.get('HH_API_URL', 'https://api.hh.ru')
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+class HHClient:
+    """Клиент http api (hh.ru, ЦБ РФ): одна requests.Session с пулом keep-alive соединений,
+     потоки для параллельных запросов, ограничение количества одновременных запросов и их частоты,
+     повтор запросов при ответах 429 и 5xx, ошибках соединения и таймаутах, необязательный постоянный кэш ответов
+
+    Attributes:
+        base_url (str): адрес api, по умолчанию переменная окружения HH_API_URL или https://api.hh.ru
+        concurrency (int): максимальное количество одновременных запросов
+        min_interval (float): минимальный интервал между началами запросов в секундах, 0 - без ограничения
+        retries (int): количество повторов запроса
+        backoff (float): начальная задержка перед повтором, удваивается с каждой попыткой
+        timeout (float): таймаут запроса в секундах
+        cache (HTTPCache): кэш ответов или None
+    """
+    def __init__(self, base_url: Optional[str] = None, concurrency: int = 8, requests_per_second: float = 0,
+                 retries: int = 5, backoff: float = 0.5, timeout: float = 30, cache: Optional[HTTPCache] = None):
+        """Создаёт сессию и пул потоков
+
+        Args:
+            base_url (str): адрес api, например адрес локального тестового сервера
+            concurrency (int): максимальное количество одновременных запросов
+            requests_per_second (float): ограничение частоты запросов, 0 - без ограничения
+            retries (int): количество повторов запроса при ответах 429 и 5xx, ошибке соединения или таймауте
+            backoff (float): начальная задержка перед повтором в секундах
+            timeout (float): таймаут запроса в секундах
+            cache (HTTPCache): кэш ответов, закрывается вместе с клиентом
+        """
+        self.base_url = (base_url or default_base_url).rstrip('/')
+        self.concurrency = concurrency
+        self.min_interval = 1 / requests_per_second if requests_per_second else 0
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.rate_lock = threading.Lock()
+        self.next_request_time = 0.0
+        self.executor = ThreadPoolExecutor(concurrency)
+
+    def wait_rate_limit(self) -> None:
+        """Ждёт, пока с начала предыдущего запроса пройдёт min_interval секунд"""
+        if not self.min_interval:
+            return
+        with self.rate_lock:
+            now = time.monotonic()
+            start = max(now, self.next_request_time)
+            self.next_request_time = start + self.min_interval
+        time.sleep(start - now)
+
+    def get_retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Возвращает задержку перед повтором: Retry-After или экспоненциальную задержку со случайной добавкой"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random() / 2)
+
+    def get_content(self, path: str, params: Optional[dict] = None) -> bytes:
+        """Выполняет GET запрос к api и возвращает тело ответа. Свежий ответ из кэша возвращается без запроса,
+         для устаревшего ответа с ETag отправляется условный запрос (If-None-Match)
+
+        Args:
+            path (str): путь запроса, например '/vacancies'
+            params (dict): параметры запроса
+
+        Returns:
+            bytes: тело ответа
+        """
+        url = requests.Request('GET', f'{self.base_url}{path}', params=params).prepare().url
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and cached[2]:
+            return cached[0]
+        headers = {'If-None-Match': cached[1]} if cached is not None and cached[1] else {}
+        for attempt in range(self.retries + 1):
+            response = None
+            with self.semaphore:
+                self.wait_rate_limit()
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == self.retries:
+                        raise
+            if response is not None and response.status_code == 304 and cached is not None:
+                self.cache.refresh(url)
+                return cached[0]
+            if response is not None and response.status_code not in retry_statuses:
+                response.raise_for_status()
+                if self.cache:
+                    self.cache.put(url, response.content, response.headers.get('ETag'))
+                return response.content
+            if attempt == self.retries:
+                response.raise_for_status()
+            time.sleep(self.get_retry_delay(attempt, response))
+
+    def get_json(self, path: str, params: Optional[dict] = None) -> dict:
+        """Выполняет GET запрос к api и возвращает json ответа (см. get_content)"""
+        return json.loads(self.get_content(path, params))
+
+    def map(self, func: Callable, items: Iterable) -> List:
+        """Параллельно применяет func к items в пуле потоков клиента, порядок результатов сохраняется"""
+        return list(self.executor.map(func, items))
+
+    def map_completed(self, func: Callable, items: Iterable) -> Iterator:
+        """Параллельно применяет func к items и возвращает результаты по мере готовности, а не в порядке items"""
+        futures = [self.executor.submit(func, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def get_vacancies_items(self, params: dict) -> List[Dict]:
+        """Возвращает вакансии одной страницы поиска"""
+        return self.get_json('/vacancies', params)['items']
+
+    def get_vacancy(self, vacancy_id) -> Dict:
+        """Возвращает полное описание вакансии"""
+        return self.get_json(f'/vacancies/{vacancy_id}')
+
+    def get_pages(self, params_list: Iterable[dict]) -> List[List[Dict]]:
+        """Параллельно загружает страницы поиска вакансий
+
+        Args:
+            params_list (Iterable[dict]): параметры запроса для каждой страницы
+
+        Returns:
+            List[List[Dict]]: вакансии каждой страницы в порядке params_list
+        """
+        return self.map(self.get_vacancies_items, params_list)
+
+    def get_vacancy_details(self, vacancy_ids: Iterable) -> List[Dict]:
+        """Параллельно загружает полные описания вакансий
+
+        Args:
+            vacancy_ids (Iterable): id вакансий
+
+        Returns:
+            List[Dict]: описания вакансий в порядке vacancy_ids
+        """
+        return self.map(self.get_vacancy, vacancy_ids)
+
+    def close(self) -> None:
+        """Останавливает потоки, закрывает соединения и кэш"""
+        self.executor.shutdown()
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,95 @@
+import sqlite3 as sql
+import threading
+import time
+from typing import Optional, Tuple
+
+default_cache_name = 'hh_cache.sqlite'
+
+
+class HTTPCache:
+    """Постоянный кэш ответов http в базе SQLite: ключ - полный url запроса, хранятся тело ответа, ETag
+     и время получения. Ответ младше ttl отдаётся без запроса, для более старого ответа с ETag
+     клиент отправляет условный запрос. Общий размер кэша ограничен, дольше всех не использованные ответы удаляются.
+     Общий размер хранится в памяти (total_bytes) и считается по базе только при открытии
+
+    Attributes:
+        file_name (str): файл базы данных кэша
+        ttl (float): время в секундах, в течение которого ответ считается свежим
+        max_bytes (int): максимальный общий размер тел ответов
+        total_bytes (int): текущий общий размер тел ответов
+    """
+    def __init__(self, file_name: str = default_cache_name, ttl: float = 24 * 60 * 60, max_bytes: int = 512 * 2 ** 20):
+        """Открывает (или создаёт) базу данных кэша
+
+        Args:
+            file_name (str): файл базы данных кэша
+            ttl (float): время в секундах, в течение которого ответ считается свежим
+            max_bytes (int): максимальный общий размер тел ответов
+        """
+        self.file_name = file_name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.con = sql.connect(file_name, check_same_thread=False)
+        with self.lock, self.con:
+            self.con.execute('PRAGMA journal_mode = WAL')
+            self.con.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, body BLOB, '
+                             'size INTEGER, stored_at REAL, accessed_at REAL)')
+            self.con.execute('CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)')
+            self.total_bytes = int(self.con.execute('SELECT TOTAL(size) FROM responses').fetchone()[0])
+
+    def get(self, url: str) -> Optional[Tuple[bytes, Optional[str], bool]]:
+        """Возвращает сохранённый ответ и отмечает его использование
+
+        Args:
+            url (str): полный url запроса
+
+        Returns:
+            Tuple[bytes, str, bool] or None: тело, ETag и признак свежести ответа или None, если ответа нет
+        """
+        now = time.time()
+        with self.lock, self.con:
+            row = self.con.execute('SELECT body, etag, stored_at FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            self.con.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (now, url))
+        body, etag, stored_at = row
+        return body, etag, now - stored_at < self.ttl
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None) -> None:
+        """Сохраняет ответ и, если кэш стал больше max_bytes, удаляет дольше всех не использованные ответы"""
+        now = time.time()
+        with self.lock, self.con:
+            old = self.con.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self.con.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                             (url, etag, body, len(body), now, now))
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self, batch_size: int = 64) -> None:
+        """Удаляет ответы по возрастанию времени использования (по индексу accessed_at),
+         пока общий размер больше max_bytes. Вызывается под блокировкой, внутри транзакции put"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.con.execute('SELECT url, size FROM responses ORDER BY accessed_at LIMIT ?',
+                                    (batch_size,)).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            evicted = []
+            for url, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                evicted.append((url,))
+                self.total_bytes -= size
+            self.con.executemany('DELETE FROM responses WHERE url = ?', evicted)
+
+    def refresh(self, url: str) -> None:
+        """Отмечает сохранённый ответ свежим после ответа 304 Not Modified"""
+        now = time.time()
+        with self.lock, self.con:
+            self.con.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+
+    def close(self) -> None:
+        """Закрывает базу данных кэша"""
+        self.con.close()
@@ -1,9 +1,16 @@
-from typing import List, Dict
-import pandas as pd
-import requests
-import concurrent.futures
+import csv
+from datetime import datetime, timedelta
+from math import ceil
+from typing import List, Dict, Tuple
+
+from hh_client import HHClient
+from http_cache import HTTPCache
+
+result_cap = 2000
+per_page = 100
+min_window = timedelta(minutes=1)
+columns = ["name", "area_name", "salary_from", "salary_to", 'description', "salary_currency", "published_at"]
 
-url = "https://api.hh.ru/vacancies"
 
 def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str], str]]) -> (List[List[str]]):
     """ формирует дату для создания итогового датафрейма
@@ -12,7 +19,7 @@ def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str
     Args:
         vacancies: список словарей выгруженных api содержащие информацию по вакасии
 
-    Returns: список вакансий c зарплатами
+    Returns: список вакансий c зарплатами в порядке столбцов columns
 
     """
     return [
@@ -21,7 +28,7 @@ def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str
             vacancy["area"]["name"],
             vacancy["salary"]["from"],
             vacancy["salary"]["to"],
-            vacancy['description'],
+            vacancy.get('description'),
             vacancy["salary"]["currency"],
             vacancy["published_at"],
         ]
@@ -29,60 +36,101 @@ def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str
         if vacancy["salary"]
     ]
 
-def get_vacancies_items(params: dict) -> (List[Dict[str, str]] or List[Dict[Dict[str, str], str]]):
-    """ поулчает json данные о вакансии по заданынм параметрам
+
+def get_params(date_from: datetime, date_to: datetime, page: int = 0) -> dict:
+    """ формирует параметры запроса страницы поиска вакансий за промежуток времени
 
     Args:
-        params: параметры для запроса
+        date_from: начало промежутка
+        date_to: конец промежутка
+        page: номер страницы
 
-    Returns: данные по вакансиям
+    Returns: параметры запроса
 
     """
-    return requests.get(url, params).json()["items"]
+    return dict(
+        specialization=1,
+        date_from=date_from.isoformat(timespec='seconds'),
+        date_to=date_to.isoformat(timespec='seconds'),
+        per_page=per_page,
+        page=page,
+    )
 
 
-if __name__ == "__main__":
-    pages_count = 20
-    params1 = [
-        dict(
-            specialization=1,
-            date_from="2022-12-26T00:00:00",
-            date_to="2022-12-26T12:00:00",
-            per_page=100,
-            page=i,
-        )
-        for i in range(pages_count)
-    ]
+def get_found(client: HHClient, window: Tuple[datetime, datetime]) -> int:
+    """ возвращает количество вакансий за промежуток времени (поле found ответа api)
 
-    params2 = [
-        dict(
-            specialization=1,
-            date_from="2022-12-26T00:12:00",
-            date_to="2022-12-27T00:00:00",
-            per_page=100,
-            page=i,
-        )
-        for i in range(pages_count)
-    ]
+    Args:
+        client: клиент api hh.ru
+        window: начало и конец промежутка
+
+    Returns: количество вакансий
+
+    """
+    return client.get_json('/vacancies', dict(get_params(*window), per_page=1))['found']
+
+
+def split_window(client: HHClient, date_from: datetime, date_to: datetime) -> List[Tuple[datetime, datetime, int]]:
+    """ делит промежуток времени пополам, пока в каждой части не станет не больше result_cap вакансий -
+    api hh.ru отдаёт не больше 2000 результатов на один запрос. Количество вакансий для всех частей
+    одного уровня деления запрашивается параллельно
+
+    Args:
+        client: клиент api hh.ru
+        date_from: начало промежутка
+        date_to: конец промежутка
+
+    Returns: части промежутка (начало, конец, количество вакансий) по возрастанию времени
+
+    """
+    windows, pending = [], [(date_from, date_to)]
+    while pending:
+        found = client.map(lambda window: get_found(client, window), pending)
+        next_pending = []
+        for (start, end), count in zip(pending, found):
+            if count <= result_cap or end - start <= min_window:
+                if count > result_cap:
+                    print(f'{start} - {end}: {count} вакансий, будут загружены только первые {result_cap}')
+                windows.append((start, end, count))
+            else:
+                middle = start + timedelta(seconds=(end - start).total_seconds() // 2)
+                next_pending += [(start, middle), (middle, end)]
+        pending = next_pending
+    return sorted(windows)
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        result = list(executor.map(get_vacancies_items, params1 + params2))
-        response = list(executor.map(execute_vacancies, result))
-        result = pd.concat(
-            [
-                pd.DataFrame(
-                    el,
-                    columns=[
-                        "name",
-                        "salary_from",
-                        "salary_to",
-                        'description',
-                        "salary_currency",
-                        "area_name",
-                        "published_at",
-                    ],
-                )
-                for el in response
-            ]
-        )
-    result.to_csv("vacancies_from_hh.csv", index=False)
+
+def harvest(client: HHClient, date_from: datetime, date_to: datetime, file_name: str) -> int:
+    """ загружает все вакансии с зарплатой за промежуток времени: делит его на части меньше result_cap,
+    параллельно загружает все страницы всех частей и записывает вакансии в csv файл по мере получения страниц.
+    Вакансии на границе двух частей записываются один раз
+
+    Args:
+        client: клиент api hh.ru
+        date_from: начало промежутка
+        date_to: конец промежутка
+        file_name: название итогового csv файла
+
+    Returns: количество записанных вакансий
+
+    """
+    windows = split_window(client, date_from, date_to)
+    params = [get_params(start, end, page)
+              for start, end, count in windows
+              for page in range(min(ceil(count / per_page), result_cap // per_page))]
+    seen, rows_count = set(), 0
+    with open(file_name, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for items in client.map_completed(client.get_vacancies_items, params):
+            items = [item for item in items if item['id'] not in seen]
+            seen.update(item['id'] for item in items)
+            rows = execute_vacancies(items)
+            writer.writerows(rows)
+            rows_count += len(rows)
+    print(f'Частей: {len(windows)}, страниц: {len(params)}, вакансий с зарплатой: {rows_count}')
+    return rows_count
+
+
+if __name__ == "__main__":
+    with HHClient(cache=HTTPCache()) as client:
+        harvest(client, datetime(2022, 12, 26), datetime(2022, 12, 27), "vacancies_from_hh.csv")
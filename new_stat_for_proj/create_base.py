@@ -1,62 +1,57 @@
-import pandas as pd
+import os
 import sqlite3 as sql
-import re
+import sys
+
+import pandas as pd
+
+# скрипт запускается из корня репозитория: python new_stat_for_proj/<скрипт>.py,
+# общие модули (vacancy_db, currency_convert, hh_client...) лежат в корне
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from currency_convert import convert_salary, daily_store_name, load_daily_rates, read_currency_table
+from vacancy_db import db_name, load_csv
+from profession_matcher import ProfessionMatcher, web_developer
 
-def apply_to_currency(row: pd.Series) -> int or None:
-    """ конверсирует salary в рубли по актуальному курсу(на момент публикации) из таблицы currencies
+
+def is_web_developer(df: pd.DataFrame) -> pd.Series:
+    """ отмечает вакансии web разработчика части csv файла с городом, датой публикации
+     и хотя бы одной границей оклада. Остальные вакансии не загружаются никогда
 
     Args:
-        row: строка DataFrame
+        df: часть csv файла
 
-    Returns: заначение salary в рублях
+    Returns: булева маска подходящих вакансий
 
     """
-    if row['salary_currency'] == 'RUR':
-        return round(row['salary'])
-    cur.execute(f"""SELECT * FROM currencies WHERE DATE = '{row['date']}'""")
-    valutes = dict(zip([col[0] for col in cur.description], cur.fetchone()))
-    if row['salary_currency'] not in valutes or valutes[row['salary_currency']] is None:
-        return None
-    return round(row['salary'] * valutes[row['salary_currency']])
-pd.set_option('expand_frame_repr', False)
+    return matcher.contains(df['name']) & df[['area_name', 'published_at']].notna().all(axis=1) \
+        & df[['salary_from', 'salary_to']].notna().any(axis=1)
+
 
-df = pd.read_csv('vacancies_with_skills.csv', low_memory=False)
+def prepare_vacancies(df: pd.DataFrame) -> pd.DataFrame:
+    """ конверсирует salary вакансий web разработчика части csv файла в рубли по актуальному курсу
+     (на момент публикации) из таблицы currencies. Вакансии без курса отбрасываются до следующей загрузки
 
+    Args:
+        df: вакансии web разработчика части csv файла
+
+    Returns: вакансии со столбцами name, key_skills, salary, area_name, date
+
+    """
+    df = df.copy()
+    df['date'] = df['published_at'].str[:7]
+    df['salary'] = df[['salary_from', 'salary_to']].mean(axis=1)
+    df['salary'] = convert_salary(df, currency_data, daily_rates=daily_rates).round()
+    df = df[['name', 'key_skills', 'salary', 'area_name', 'date']]
+    return df.dropna(subset=['salary'])
+
+
+pd.set_option('expand_frame_repr', False)
 # df = df.dropna(subset=['name', 'key_skills', 'salary_currency',  'area_name', 'published_at']) \
 #     .dropna(subset=['salary_from', 'salary_to'], how='all').reset_index(drop=True)
-con = sql.connect('vacancy_db')
-cur = con.cursor()
-pd.set_option
-df = df.dropna(subset=['salary_from', 'salary_to'], how='all').reset_index(drop=True)
-df['date'] = df['published_at'].str[:7]
-
-
-df['salary'] = df[['salary_from', 'salary_to']].mean(axis=1)
-df['salary'] = df.apply(axis=1, func=apply_to_currency)
-# print(df[df['date']=='2005-12'].head(10))
-df = df[['name', 'key_skills', 'salary', 'area_name', 'date']]
-df = df.dropna(subset=['name',  'salary', 'area_name', 'date']).reset_index(drop=True)
-vacancy_name = ['web develop', 'веб разработчик', 'web разработчик', 'web programmer', 'web программист',
-                'веб программист', 'битрикс разработчик', 'bitrix разработчик', 'drupal разработчик', 'cms разработчик',
-                'wordpress разработчик', 'wp разработчик', 'joomla разработчик', 'drupal developer', 'cms developer',
-                'wordpress developer', 'wp developer', 'joomla developer']
-flag = True
-for vac in vacancy_name:
-    if(flag):
-        df2 = df[df['name'].str.contains(vac, flags=re.IGNORECASE,
-                                                 regex=True)]
-    else:
-        new = df[df['name'].str.contains(vac, flags=re.IGNORECASE,
-                                                 regex=True)]
-        print(new.shape[0])
-        df2 = pd.concat([df2, new], axis=0, ignore_index=True)
-        print(df2.shape[0])
-    flag = False
-
-print(df2.shape[0])
-# print(df[df['date']=='2005-12'].head(10))
-# years = df2[df2['date']][:4].unique
-# print(df2[df2['date']=='2010-12'].head(10))
-df2.to_sql('vacs_with_prof', con=con, index=True, if_exists='append')
-# df2.to_sql('skills_with_vac', con=con, index=True, if_exists='append')
\ No newline at end of file
+con = sql.connect(db_name)
+currency_data = read_currency_table(con)
+daily_rates = load_daily_rates(daily_store_name) if os.path.exists(daily_store_name) else None
+matcher = ProfessionMatcher(web_developer)
+print(load_csv('vacancies_with_skills.csv', con, 'vacs_with_prof', prepare_vacancies,
+               keep_rows=is_web_developer, low_memory=False))
+# df2.to_sql('skills_with_vac', con=con, index=True, if_exists='append')
@@ -1,13 +1,17 @@
 import json
-
-import concurrent.futures
-import re
+import os
+import sys
 from typing import List, Dict
 
 import pandas as pd
-import requests
 
-url = "https://api.hh.ru/vacancies"
+# скрипт запускается из корня репозитория: python new_stat_for_proj/<скрипт>.py,
+# общие модули (vacancy_db, currency_convert, hh_client...) лежат в корне
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hh_client import HHClient
+from http_cache import HTTPCache
+from profession_matcher import ProfessionMatcher
 
 def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str], str]]) -> (List[List[str]]):
     """ формирует дату для создания итогового датафрейма
@@ -30,15 +34,6 @@ def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str
         if vacancy["salary"]
     ]
 
-def get_vacancies_items(params: dict) -> (List[Dict[str, str]] or List[Dict[Dict[str, str], str]]):
-    """ поулчает json данные о вакансии по заданынм параметрам
-    Args:
-        params: параметры для запроса
-    Returns: данные по вакансиям
-    """
-    return requests.get(url, params).json()["items"]
-
-
 def get_latest_vac():
     if __name__ == "__main__":
         pd.set_option('expand_frame_repr', False)
@@ -66,9 +61,9 @@ def get_latest_vac():
             for i in range(pages_count)
         ]
 
-        with concurrent.futures.ProcessPoolExecutor() as executor:
-            result = list(executor.map(get_vacancies_items, params1 + params2))
-            response = list(executor.map(execute_vacancies, result))
+        with HHClient(cache=HTTPCache()) as client:
+            result = client.get_pages(params1 + params2)
+            response = [execute_vacancies(items) for items in result]
             result = pd.concat(
                 [
                     pd.DataFrame(
@@ -86,36 +81,19 @@ def get_latest_vac():
                     for el in response
                 ]
             )
-        print(result)
-        vacancy_name = ['web-develop', 'веб-разработчик', 'web-разработчик', 'web programmer', 'web программист','битрикс',
-                        'веб программист', 'битрикс разработчик', 'bitrix разработчик', 'drupal разработчик',
-                        'cms разработчик',
-                        'wordpress разработчик', 'wp разработчик', 'joomla разработчик', 'drupal developer',
-                        'cms developer',
-                        'wordpress developer', 'wp developer', 'joomla developer']
-        flag = True
-        for vac in vacancy_name:
-            if (flag):
-                df2 = result[result['name'].str.contains(vac, flags=re.IGNORECASE,
-                                                         regex=True)]
-            else:
-                new = result[result['name'].str.contains(vac, flags=re.IGNORECASE,
-                                                         regex=True)]
-                print(new.shape[0])
-                df2 = pd.concat([df2, new], axis=0, ignore_index=True)
-                print(df2.shape[0])
-            flag = False
-        df2 = df2.head(10)
-        print(df2)
-        for i in range(df2.shape[0]):
-            print(df2.loc[[i], ['id']].values[0][0])
-            new_get = requests.get(f"https://api.hh.ru/vacancies/{df2.loc[[i], ['id']].values[0][0]}").json()
-            print(new_get)
-            df2.loc[[i], ['description']] = new_get['description']
-            if (len(new_get['key_skills']) != 0):
-                df2.loc[[i], ['key_skills']] = ", ".join([x['name'] for x in new_get['key_skills']])
-            else:
-                df2.loc[[i], ['key_skills']] = ""
+            print(result)
+            vacancy_name = ['web-develop', 'веб-разработчик', 'web-разработчик', 'web programmer', 'web программист','битрикс',
+                            'веб программист', 'битрикс разработчик', 'bitrix разработчик', 'drupal разработчик',
+                            'cms разработчик',
+                            'wordpress разработчик', 'wp разработчик', 'joomla разработчик', 'drupal developer',
+                            'cms developer',
+                            'wordpress developer', 'wp developer', 'joomla developer']
+            df2 = result[ProfessionMatcher(vacancy_name).contains(result['name'])].reset_index(drop=True)
+            df2 = df2.head(10)
+            print(df2)
+            details = client.get_vacancy_details(df2['id'].tolist())
+        df2['description'] = [detail['description'] for detail in details]
+        df2['key_skills'] = [", ".join([x['name'] for x in detail['key_skills']]) for detail in details]
 
         df2["published_at"] = df2["published_at"].apply(lambda x: x[:10])
         df2['salary'] = df2[['salary_from', 'salary_to']].mean(axis=1)
@@ -1,10 +1,15 @@
 import json
+import os
+import sys
 from typing import List, Dict
 import pandas as pd
-import requests
-import concurrent.futures
 
-url = "https://api.hh.ru/vacancies"
+# скрипт запускается из корня репозитория: python new_stat_for_proj/<скрипт>.py,
+# общие модули (vacancy_db, currency_convert, hh_client...) лежат в корне
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hh_client import HHClient
+from http_cache import HTTPCache
 
 def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str], str]]) -> (List[List[str]]):
     """ формирует дату для создания итогового датафрейма
@@ -31,21 +36,6 @@ def execute_vacancies(vacancies: List[Dict[str, str]] or List[Dict[Dict[str, str
         if vacancy["salary"]
     ]
 
-def get_vacancies_items(params: dict) -> (List[Dict[str, str]] or List[Dict[Dict[str, str], str]]):
-    """ поулчает json данные о вакансии по заданынм параметрам
-
-    Args:
-        params: параметры для запроса
-
-    Returns: данные по вакансиям
-
-    """
-    return requests.get(url, params).json()["items"]
-
-
-
-
-
 if __name__ == "__main__":
     pd.set_option('expand_frame_repr', False)
     params = dict(
@@ -55,18 +45,11 @@ if __name__ == "__main__":
             per_page=30,
             page=1,
         )
-    res = requests.get(url, params).json()['items']
-    res = execute_vacancies(res)
-    for i, el in enumerate(res):
-        new_get = requests.get(f"https://api.hh.ru/vacancies/{el[0]}").json()
-        el.pop(0)
-
-        el.append(new_get['description'])
-        if(len(new_get['key_skills']) != 0):
-            el.append(", ".join([x['name'] for x in new_get['key_skills']]))
-        else:
-            res.pop(i)
-    res= [x for x in res if len(x)==9]
+    with HHClient(cache=HTTPCache()) as client:
+        res = execute_vacancies(client.get_vacancies_items(params))
+        details = client.get_vacancy_details([el[0] for el in res])
+    res = [el[1:] + [new_get['description'], ", ".join([x['name'] for x in new_get['key_skills']])]
+           for el, new_get in zip(res, details) if len(new_get['key_skills']) != 0]
     df = pd.DataFrame(
                 res,
                 columns=[
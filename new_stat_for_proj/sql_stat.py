@@ -1,123 +1,149 @@
+import os
 import sqlite3
+import sys
+import time
+from typing import Tuple
 
 import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
 
-pd.set_option('expand_frame_repr', False)
-conn = sqlite3.connect('vacancy_db')
-cursor = conn.cursor()
-salary_by_year = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-            round(avg(salary)) as avg_salary 
-                        from vacancies
-                        group by year""", conn)
-count_by_year = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-                count(salary) as count
-                        from vacancies
-                        group by year """, conn)
-
-count_by_year_with_vac = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-                count(salary) as count
-                        from vacs_with_prof
-                        group by year """, conn)
-
-salary_by_year_with_vac = pd.read_sql("""select STRFTIME('%Y', date || '-01') AS 'year',
-            round(avg(salary)) as avg_salary 
-                        from vacs_with_prof
-                        group by year""", conn)
-
-salary_by_city = pd.read_sql("""select area_name, avg from
-                        (select area_name, round(avg(salary)) as avg,
-                         count(salary) as count
-                        from vacancies
-                        group by area_name
-                        order by avg desc)
-                    where count > (select count(*) from vacancies) * 0.01
-                    limit 10""", conn)
-
-count_by_city = pd.read_sql("""select area_name,
-                        round(cast(count as real) / (select count(*) from vacancies), 4)
-                         as percent from
-                        (select area_name, count(salary) as count
-                        from vacancies
-                        group by area_name
-                        order by count desc)
-                        limit 10""", conn)
-
-
-years = salary_by_year['year'].tolist()
-# lst = [count_by_year, count_by_city, count_by_year_with_vac, salary_by_year, salary_by_city, salary_by_year_with_vac]
-# for data in [salary_by_year, count_by_year, salary_by_year_with_vac, count_by_year_with_vac]:
-salary_by_year = salary_by_year.set_index('year')
-count_by_year = count_by_year.set_index('year')
-salary_by_year_with_vac = salary_by_year_with_vac.set_index('year')
-count_by_year_with_vac = count_by_year_with_vac.set_index('year')
-# print(salary_by_year.dtypes)
-# salary_by_year = salary_by_year[salary_by_year['avg_salary'] < 350000]
-# print(salary_by_year[salary_by_year['avg_salary'] > 30000].shape[0])
-# df45 = salary_by_year[salary_by_year.loc[2005]]
-# print(salary_by_year[salary_by_year['year'] == 2005])
-salary_by_year_with_vac = salary_by_year_with_vac.reindex(years)
-count_by_year_with_vac = count_by_year_with_vac.reindex(years)
-# print(salary_by_year_with_vac.head(10))
-df3 = pd.concat([salary_by_year,  salary_by_year_with_vac, count_by_year, count_by_year_with_vac], axis=1,
-                ignore_index=True)
-df3.rename(columns={"year": 'Год', 0: 'Средняя зарплата, (руб.)', 1: "Средняя зарплата - web разработчик, (руб.)",
-                   2: "Количество вакансий", 3: "Количество вакансий - web разработчик"}, inplace=True)
-# df = pd.concat([salary_by_year, count_by_year, salary_by_year_with_vac, count_by_year_with_vac])
-df2 = pd.concat([salary_by_city, count_by_city], axis=1, ignore_index=True)
-df2.rename(columns={0: 'Город', 1: "Уровень зарплат, (руб.)",
-                   2: "Город", 3: "Доля вакансий"}, inplace=True)
-df3.to_excel('report_new/report1.xlsx', sheet_name='Статистика по годам')
-df2.to_excel('report_new/report2.xlsx', sheet_name='Статистика по городам', index=False)
-fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2)
-x = np.arange(int(salary_by_year.shape[0]))
-width = 0.4
-ax1.bar(x - width / 2, salary_by_year['avg_salary'].tolist(), width, label='средняя з/п')
-ax1.bar(x + width / 2, salary_by_year_with_vac['avg_salary'].tolist(), width, label=f'з/п web разработчик')
-ax1.set_title('Уровень зарплат по годам')
-plt.sca(ax1)
-plt.xticks(x, salary_by_year.index.tolist(), fontsize=10, rotation=90)
-ax1.legend(loc='upper left', fontsize=10)
-ax1.grid(axis='y')
-ax1.set_ylim([0, 120000])
-ax2.bar(x - width / 2, count_by_year['count'].tolist(), width, label='Количество вакансий')
-ax2.bar(x + width / 2, count_by_year_with_vac['count'].tolist(), width, label=f'Количество вакансий web разработчик')
-ax2.set_title('Количество вакансий по годам')
-ax2.set_ylim([0, 10000])
-plt.sca(ax2)
-plt.xticks(x, count_by_year.index.tolist(), fontsize=10, rotation=90)
-
-ax2.legend(loc='upper left', fontsize=10)
-ax2.grid(axis='y')
-fig.set_figheight(5)
-fig.set_figwidth(10)
-fig.tight_layout()
-
-fig.savefig('report_new/graph1.png')
-
-
-fig1, (ax3, ax4) = plt.subplots(nrows=1, ncols=2)
-cities = salary_by_city['area_name'].tolist()
-y_pos = np.arange(len(cities))
-ax3.barh(y_pos, salary_by_city['avg'].tolist(), align='center')
-plt.sca(ax3)
-plt.yticks(y_pos, cities, fontsize=10)
-ax3.invert_yaxis()  # labels read top-to-bottom
-ax3.set_title('Уровень зарплат по городам')
-ax3.grid(axis='x')
-
-x = ['Другие'] + count_by_city['area_name'].tolist()
-ax4.set_title('Доля вакансий по городам')
-city_percent = count_by_city['percent'].tolist()
-city_percent.insert(0, 1 - sum(city_percent))
-ax4.pie(city_percent, radius=1, labels=x, textprops={'fontsize': 10})
-
-fig1.tight_layout()
-fig1.set_figheight(5)
-fig1.set_figwidth(10)
-plt.show()
-fig1.savefig('report_new/graph2.png')
+# скрипт запускается из корня репозитория: python new_stat_for_proj/<скрипт>.py,
+# общие модули (vacancy_db, currency_convert, hh_client...) лежат в корне
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vacancy_db import create_summary_tables, db_name
+
+
+def read_timed(conn: sqlite3.Connection, report: str, query: str) -> pd.DataFrame:
+    """Выполняет запрос отчёта и выводит время его выполнения
+
+    Args:
+        conn (sqlite3.Connection): соединение с базой данных
+        report (str): название отчёта для вывода
+        query (str): sql запрос
+
+    Returns:
+        pd.DataFrame: результат запроса
+    """
+    start = time.perf_counter()
+    result = pd.read_sql(query, conn)
+    print(f'{report}: {time.perf_counter() - start:.3f} c')
+    return result
+
+
+def get_year_report(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Возвращает статистику по годам одним запросом: средняя зарплата и количество вакансий,
+     всего и для профессии. Годы берутся из всех вакансий, для лет без вакансий профессии - NaN
+
+    Args:
+        conn (sqlite3.Connection): соединение с базой данных
+
+    Returns:
+        pd.DataFrame: индекс year, столбцы avg_salary, avg_salary_vac, count, count_vac
+    """
+    return read_timed(conn, 'Статистика по годам', """select y.year,
+                        round(y.salary_sum / y.salary_count) as avg_salary,
+                        round(p.salary_sum / p.salary_count) as avg_salary_vac,
+                        y.salary_count as count,
+                        p.salary_count as count_vac
+                    from year_stats y left join profession_year_stats p on p.year = y.year
+                    order by y.year""").set_index('year')
+
+
+def get_city_report(conn: sqlite3.Connection) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Возвращает статистику по городам одним запросом: 10 городов с наибольшей средней зарплатой
+     (среди городов, где больше 1% вакансий) и 10 городов с наибольшей долей вакансий
+
+    Args:
+        conn (sqlite3.Connection): соединение с базой данных
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: столбцы area_name, avg и столбцы area_name, percent
+    """
+    cities = read_timed(conn, 'Статистика по городам', """with
+                    total as (select sum(rows_count) as count from city_stats),
+                    ranked as (select area_name,
+                        round(salary_sum / salary_count) as avg,
+                        round(cast(salary_count as real) / (select count from total), 4) as percent,
+                        salary_count > (select count from total) * 0.01 as is_needed,
+                        row_number() over (partition by salary_count > (select count from total) * 0.01
+                                           order by round(salary_sum / salary_count) desc) as salary_rank,
+                        row_number() over (order by salary_count desc) as count_rank
+                    from city_stats)
+                    select * from ranked
+                    where (is_needed and salary_rank <= 10) or count_rank <= 10""")
+    salary_by_city = cities[cities['is_needed'] & (cities['salary_rank'] <= 10)].sort_values('salary_rank')
+    count_by_city = cities[cities['count_rank'] <= 10].sort_values('count_rank')
+    return salary_by_city[['area_name', 'avg']].reset_index(drop=True), \
+        count_by_city[['area_name', 'percent']].reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    pd.set_option('expand_frame_repr', False)
+    conn = sqlite3.connect(db_name)
+    create_summary_tables(conn, 'vacancies')
+    create_summary_tables(conn, 'vacs_with_prof')
+    year_report = get_year_report(conn)
+    salary_by_city, count_by_city = get_city_report(conn)
+
+    df3 = year_report.rename(columns={'avg_salary': 'Средняя зарплата, (руб.)',
+                                      'avg_salary_vac': "Средняя зарплата - web разработчик, (руб.)",
+                                      'count': "Количество вакансий", 'count_vac': "Количество вакансий - web разработчик"})
+    df2 = pd.concat([salary_by_city, count_by_city], axis=1, ignore_index=True)
+    df2.rename(columns={0: 'Город', 1: "Уровень зарплат, (руб.)",
+                       2: "Город", 3: "Доля вакансий"}, inplace=True)
+    df3.to_excel('report_new/report1.xlsx', sheet_name='Статистика по годам')
+    df2.to_excel('report_new/report2.xlsx', sheet_name='Статистика по городам', index=False)
+    fig, (ax1, ax2) = plt.subplots(nrows=1, ncols=2)
+    x = np.arange(int(year_report.shape[0]))
+    width = 0.4
+    ax1.bar(x - width / 2, year_report['avg_salary'].tolist(), width, label='средняя з/п')
+    ax1.bar(x + width / 2, year_report['avg_salary_vac'].tolist(), width, label=f'з/п web разработчик')
+    ax1.set_title('Уровень зарплат по годам')
+    plt.sca(ax1)
+    plt.xticks(x, year_report.index.tolist(), fontsize=10, rotation=90)
+    ax1.legend(loc='upper left', fontsize=10)
+    ax1.grid(axis='y')
+    ax1.set_ylim([0, 120000])
+    ax2.bar(x - width / 2, year_report['count'].tolist(), width, label='Количество вакансий')
+    ax2.bar(x + width / 2, year_report['count_vac'].tolist(), width, label=f'Количество вакансий web разработчик')
+    ax2.set_title('Количество вакансий по годам')
+    ax2.set_ylim([0, 10000])
+    plt.sca(ax2)
+    plt.xticks(x, year_report.index.tolist(), fontsize=10, rotation=90)
+
+    ax2.legend(loc='upper left', fontsize=10)
+    ax2.grid(axis='y')
+    fig.set_figheight(5)
+    fig.set_figwidth(10)
+    fig.tight_layout()
+
+    fig.savefig('report_new/graph1.png')
+
+
+    fig1, (ax3, ax4) = plt.subplots(nrows=1, ncols=2)
+    cities = salary_by_city['area_name'].tolist()
+    y_pos = np.arange(len(cities))
+    ax3.barh(y_pos, salary_by_city['avg'].tolist(), align='center')
+    plt.sca(ax3)
+    plt.yticks(y_pos, cities, fontsize=10)
+    ax3.invert_yaxis()  # labels read top-to-bottom
+    ax3.set_title('Уровень зарплат по городам')
+    ax3.grid(axis='x')
+
+    x = ['Другие'] + count_by_city['area_name'].tolist()
+    ax4.set_title('Доля вакансий по городам')
+    city_percent = count_by_city['percent'].tolist()
+    city_percent.insert(0, 1 - sum(city_percent))
+    ax4.pie(city_percent, radius=1, labels=x, textprops={'fontsize': 10})
+
+    fig1.tight_layout()
+    fig1.set_figheight(5)
+    fig1.set_figwidth(10)
+    plt.show()
+    fig1.savefig('report_new/graph2.png')
+
 
 def generate_image(self):
     """Генерирует изображение в директории report под именем report.png, с 4мя графиками: гистограммами 'Уровень зарплат по годам',
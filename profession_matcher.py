@@ -0,0 +1,78 @@
+import re
+from typing import Set
+
+web_developer = ['web develop', 'веб разработчик', 'web разработчик', 'web programmer', 'web программист',
+                 'веб программист', 'битрикс разработчик', 'bitrix разработчик', 'drupal разработчик',
+                 'cms разработчик', 'wordpress разработчик', 'wp разработчик', 'joomla разработчик',
+                 'drupal developer', 'cms developer', 'wordpress developer', 'wp developer', 'joomla developer']
+
+
+class ProfessionMatcher:
+    """Класс для отбора вакансий по названию профессии за один проход по строке
+
+    Все подстроки приводятся к нижнему регистру (casefold) один раз и собираются
+    в одно скомпилированное регулярное выражение вместо цикла по подстрокам.
+
+    Attributes:
+        groups (Dict[str, str]): подстрока в нижнем регистре -> название группы профессий
+        regex (re.Pattern): скомпилированное выражение-альтернатива всех подстрок
+        lookahead (re.Pattern): то же выражение внутри lookahead, находит совпадения, начинающиеся в любой позиции
+    """
+    def __init__(self, patterns):
+        """Инициализирует объект ProfessionMatcher
+
+        Args:
+            patterns (str or List[str] or Dict[str, List[str]]): подстрока, список подстрок
+             (тогда каждая подстрока - своя группа) или словарь группа -> список подстрок
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not isinstance(patterns, dict):
+            patterns = {pattern: [pattern] for pattern in patterns}
+        self.groups = {}
+        for group, group_patterns in patterns.items():
+            for pattern in group_patterns:
+                self.groups.setdefault(pattern.casefold(), group)
+        alternatives = sorted(self.groups, key=len, reverse=True)
+        self.regex = re.compile('|'.join(map(re.escape, alternatives)) if alternatives else '(?!)')
+        self.lookahead = re.compile(f'(?=({self.regex.pattern}))')
+
+    def matches(self, name: str) -> bool:
+        """Проверяет, подходит ли название вакансии хотя бы под одну подстроку
+
+        Args:
+            name (str): название вакансии
+
+        Returns:
+            bool: True, если название содержит одну из подстрок (без учёта регистра)
+
+        >>> ProfessionMatcher(['web develop', 'wp developer']).matches('Senior WEB Developer')
+        True
+        """
+        return self.regex.search(name.casefold()) is not None
+
+    def classify(self, name: str) -> Set[str]:
+        """Возвращает все группы профессий, к которым относится название вакансии
+
+        Args:
+            name (str): название вакансии
+
+        Returns:
+            Set[str]: названия групп, пустое множество если совпадений нет
+
+        >>> sorted(ProfessionMatcher({'web': ['web develop'], 'cms': ['wordpress']}).classify('WordPress web developer'))
+        ['cms', 'web']
+        """
+        return {self.groups[match.group(1)] for match in self.lookahead.finditer(name.casefold())}
+
+    def contains(self, names):
+        """Векторный аналог matches для столбца pandas: одна проверка на строку,
+         поэтому строка, подходящая под несколько подстрок, попадает в выборку один раз
+
+        Args:
+            names (pd.Series): столбец с названиями вакансий
+
+        Returns:
+            pd.Series: булева маска
+        """
+        return names.str.casefold().str.contains(self.regex.pattern, regex=True, na=False)
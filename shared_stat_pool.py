@@ -0,0 +1,226 @@
+import os
+import pickle
+import queue
+import time
+import traceback
+from multiprocessing import Barrier, Process, Queue, shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from csv_chunks import split_tasks
+from statistics import get_partial_stat, StatAccumulator
+
+min_year = 2000
+years_count = 40
+year_fields = 4
+city_fields = 2
+poll_interval = 1.0
+
+
+def physical_cpu_count() -> int:
+    """Возвращает количество физических ядер (psutil, если установлен), иначе логических"""
+    try:
+        import psutil
+    except ImportError:
+        return os.cpu_count() or 1
+    return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+
+
+def stat_worker(worker_id, shm_name, shape, tasks, results, barrier):
+    """Процесс пула: берёт задания из очереди и складывает суммы и количества в свою строку общей памяти.
+     Годы хранятся по индексу year - min_year, города - по кодам, которые процесс назначает сам,
+     названия городов и то, что не поместилось в массивы, передаются родителю при сбросе ('flush')
+
+    Args:
+        worker_id (int): номер процесса, номер его строки в общей памяти
+        shm_name (str): имя блока multiprocessing.shared_memory
+        shape (Tuple[int, int]): размер массива в общей памяти
+        tasks (Queue): очередь заданий (название файла, диапазон байт, профессия), 'flush' или None
+        results (Queue): очередь для названий городов, остатка статистики и времени заданий ('flush')
+         и для ошибок заданий ('error'): ошибка одного задания не останавливает процесс
+        barrier (Barrier): не даёт процессу забрать второй 'flush' до того, как родитель прочитает память
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    stats = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[worker_id]
+    by_year = stats[:years_count * year_fields].reshape(years_count, year_fields)
+    by_city = stats[years_count * year_fields:].reshape(-1, city_fields)
+    cities, overflow, timings = {}, StatAccumulator(), []
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        if task == 'flush':
+            results.put(('flush', worker_id, list(cities), overflow, timings))
+            try:
+                barrier.wait()
+            except BrokenBarrierError:
+                break
+            cities, overflow, timings = {}, StatAccumulator(), []
+            continue
+        start = time.perf_counter()
+        file_name, byte_range, vacancy_name = task
+        try:
+            stat = get_partial_stat(file_name, vacancy_name, byte_range)
+        except Exception as error:
+            try:
+                pickle.dumps(error)
+            except Exception:
+                error = RuntimeError(repr(error))
+            results.put(('error', worker_id, error, traceback.format_exc()))
+            continue
+        for year in stat.count_by_year:
+            if 0 <= year - min_year < years_count:
+                by_year[year - min_year] += (stat.salary_sum_by_year[year], stat.count_by_year[year],
+                                             stat.salary_sum_by_year_vac[year], stat.count_by_year_vac[year])
+            else:
+                overflow.salary_sum_by_year[year] = overflow.salary_sum_by_year.get(year, 0) + \
+                    stat.salary_sum_by_year[year]
+                overflow.count_by_year[year] = overflow.count_by_year.get(year, 0) + stat.count_by_year[year]
+                overflow.salary_sum_by_year_vac[year] = overflow.salary_sum_by_year_vac.get(year, 0) + \
+                    stat.salary_sum_by_year_vac[year]
+                overflow.count_by_year_vac[year] = overflow.count_by_year_vac.get(year, 0) + \
+                    stat.count_by_year_vac[year]
+        for city in stat.count_by_city:
+            if city not in cities and len(cities) < len(by_city):
+                cities[city] = len(cities)
+            if city in cities:
+                by_city[cities[city]] += (stat.salary_sum_by_city[city], stat.count_by_city[city])
+            else:
+                overflow.salary_sum_by_city[city] = overflow.salary_sum_by_city.get(city, 0) + \
+                    stat.salary_sum_by_city[city]
+                overflow.count_by_city[city] = overflow.count_by_city.get(city, 0) + stat.count_by_city[city]
+        timings.append((file_name, byte_range, time.perf_counter() - start))
+    del stats, by_year, by_city
+    shm.close()
+
+
+class SharedStatPool:
+    """Постоянный пул процессов для подсчёта статистики по одному большому csv файлу или папке чанков.
+     Процессы создаются один раз, задания передаются через очередь ограниченного размера,
+     частичная статистика складывается в массивы общей памяти вместо передачи словарей через pickle
+
+    Attributes:
+        workers (int): количество процессов, по умолчанию - количество физических ядер
+        shm (shared_memory.SharedMemory): общая память: строка на процесс, годы и города
+        shape (Tuple[int, int]): размер массива в общей памяти
+        tasks (Queue): очередь заданий
+        results (Queue): очередь ответов процессов при сбросе
+        timings (dict(int: list)): время выполнения заданий каждым процессом за последний запуск
+    """
+    def __init__(self, workers=None, queue_size=None, max_cities=4096):
+        """Запускает процессы пула
+
+        Args:
+            workers (int): количество процессов, по умолчанию physical_cpu_count()
+            queue_size (int): максимальное количество заданий в очереди, по умолчанию 2 * workers
+            max_cities (int): количество городов, которые процесс хранит в общей памяти, остальные передаются pickle
+        """
+        self.workers = workers or physical_cpu_count()
+        self.shape = (self.workers, years_count * year_fields + max_cities * city_fields)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)) * 8)
+        self.stats = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        self.tasks = Queue(queue_size or 2 * self.workers)
+        self.results = Queue()
+        self.barrier = Barrier(self.workers + 1)
+        self.timings = {}
+        self.broken = False
+        self.processes = [Process(target=stat_worker,
+                                  args=(worker_id, self.shm.name, self.shape, self.tasks, self.results, self.barrier))
+                          for worker_id in range(self.workers)]
+        for process in self.processes:
+            process.start()
+
+    def run(self, path, vacancy_name, parts=None):
+        """Считает статистику по файлу или папке чанков
+
+        Args:
+            path (str): путь к csv файлу или к папке с csv чанками
+            vacancy_name (str or List[str]): название профессии или список названий
+            parts (int): количество диапазонов байт для одного файла, по умолчанию 4 * workers
+
+        Returns:
+            StatAccumulator: общая статистика
+        """
+        if self.broken:
+            raise RuntimeError('Пул остановлен после завершения процесса')
+        self.stats[:] = 0
+        for file_name, byte_range in split_tasks(path, parts or 4 * self.workers):
+            self.put_task((file_name, byte_range, vacancy_name))
+        for _ in range(self.workers):
+            self.put_task('flush')
+        answers, errors = [], []
+        while len(answers) < self.workers:
+            try:
+                answer = self.results.get(timeout=poll_interval)
+            except queue.Empty:
+                self.check_workers()
+                continue
+            (answers if answer[0] == 'flush' else errors).append(answer[1:])
+        stat = StatAccumulator(vacancy_name)
+        for worker_id, cities, overflow, timings in answers:
+            self.timings[worker_id] = timings
+            by_year = self.stats[worker_id, :years_count * year_fields].reshape(years_count, year_fields)
+            by_city = self.stats[worker_id, years_count * year_fields:].reshape(-1, city_fields)
+            partial = StatAccumulator()
+            for index in np.flatnonzero(by_year[:, 1]):
+                year = min_year + int(index)
+                partial.salary_sum_by_year[year] = by_year[index, 0]
+                partial.count_by_year[year] = int(by_year[index, 1])
+                partial.salary_sum_by_year_vac[year] = by_year[index, 2]
+                partial.count_by_year_vac[year] = int(by_year[index, 3])
+            for code, city in enumerate(cities):
+                partial.salary_sum_by_city[city] = by_city[code, 0]
+                partial.count_by_city[city] = int(by_city[code, 1])
+            stat.merge(partial).merge(overflow)
+        stat.vacancies_count = sum(stat.count_by_year.values())
+        self.barrier.wait()
+        if errors:
+            worker_id, error, error_traceback = errors[0]
+            raise error from RuntimeError(f'Ошибка в процессе {worker_id}:\n{error_traceback}')
+        return stat
+
+    def put_task(self, task):
+        """Кладёт задание в очередь, не зависая, если процессы пула завершились и очередь не разбирается"""
+        while True:
+            try:
+                self.tasks.put(task, timeout=poll_interval)
+                return
+            except queue.Full:
+                self.check_workers()
+
+    def check_workers(self):
+        """Проверяет, что все процессы живы. Если процесс завершился (например, убит системой),
+         останавливает остальные процессы и выбрасывает RuntimeError вместо бесконечного ожидания ответа"""
+        dead = [worker_id for worker_id, process in enumerate(self.processes) if not process.is_alive()]
+        if dead:
+            self.broken = True
+            self.barrier.abort()
+            for process in self.processes:
+                process.terminate()
+            raise RuntimeError(f'Процессы пула {dead} завершились, статистика не посчитана')
+
+    def print_timings(self):
+        """Выводит время работы каждого процесса за последний запуск и отмечает отстающие"""
+        busy = {worker_id: sum(timing[2] for timing in timings) for worker_id, timings in self.timings.items()}
+        median = sorted(busy.values())[len(busy) // 2] if busy else 0
+        for worker_id, seconds in sorted(busy.items()):
+            mark = ' - отстаёт' if median and seconds > 1.5 * median else ''
+            print(f'Процесс {worker_id}: заданий {len(self.timings[worker_id])}, {seconds:.2f} c{mark}')
+
+    def close(self):
+        """Останавливает процессы и освобождает общую память"""
+        if not self.broken:
+            for _ in self.processes:
+                self.tasks.put(None)
+        for process in self.processes:
+            process.join()
+        del self.stats
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
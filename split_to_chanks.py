@@ -1,10 +1,12 @@
 import pandas as pd
-from datetime import datetime
+
+from columnar_cache import read_csv_cached
+from date_parser import get_years
 
 pd.set_option('expand_frame_repr', False)
 file = 'vacancies_by_year.csv'
-df = pd.read_csv(file)
-df['years'] = df['published_at'].apply(lambda x: datetime.strptime(x, "%Y-%m-%dT%H:%M:%S%z").year)
+df = read_csv_cached(file)
+df['years'] = get_years(df['published_at'])
 unique_years = df['years'].unique()
 
 for year in unique_years:
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import pdfkit
+from city_ranking import rank_cities
 from task_3_3_2 import create_vacancies
 from jinja2 import Environment, FileSystemLoader
 
@@ -63,17 +64,10 @@ def create_report():
 
     print('Создание первых четырех словарей')
 
-    area = df['area_name'].value_counts().to_dict()
-    area = dict(sorted(area.items(), key=lambda x: x[1], reverse=True))
-    vacs_sum = len(df)
-    result_city = [city for city in area.keys() if area[city] / vacs_sum > 0.01]
-    salary_by_cities = {}
-    vacs_by_cities = {}
-
-    for i in range(10):
-        city = result_city[i]
-        salary_by_cities[city] = mean_to_number(df[df['area_name'] == city]['salary'].mean())
-        vacs_by_cities[city] = round((len(df[df['area_name'] == city]) / vacs_sum), 4)
+    city_salaries = df.groupby('area_name')['salary'].agg(['sum', 'count'])
+    salary_by_cities, vacs_by_cities = rank_cities(df['area_name'].value_counts().to_dict(),
+                                                   city_salaries['sum'].to_dict(), len(df),
+                                                   city_salaries['count'].to_dict())
 
     print('Динамика уровня зарплат по годам:', salary_by_years)
     print('Динамика количества вакансий по годам:', vacs_by_years)
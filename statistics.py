@@ -1,5 +1,6 @@
-import csv, re, os, datetime
-from typing import List, Dict, Tuple, Any
+import csv, os, json
+from array import array
+from typing import List, Dict, Tuple, Any, Iterable, Iterator
 
 import cProfile
 from pstats import Stats, SortKey
@@ -18,6 +19,13 @@ from xlsx2html import xlsx2html
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
 
+from city_ranking import rank_cities
+from columnar_cache import load_columns
+from csv_chunks import read_header, iter_range_rows
+from date_parser import get_year
+from text_cleaner import clean_string
+from profession_matcher import ProfessionMatcher, web_developer
+
 currency_to_rub = {"AZN": 35.68,
                    "BYR": 23.91,
                    "EUR": 59.90,
@@ -37,15 +45,23 @@ class DataSet:
             file_name (str): название вводимого файла csv
             vacancies_objects (List[Vacancy]): список состоящий из экземпляров класса Vacancy,
              содержащий только те строки, которые заполнены полностью, и не содержат пустые элементы.
+            text_fields (Tuple[str]): текстовые поля, которые очищаются от html тэгов и лишних пробелов,
+             числовые поля и даты не очищаются
 
     """
-    def __init__(self, file_name):
+    text_fields = ('name', 'area_name')
+
+    def __init__(self, file_name, stream=False, byte_range=None):
         """Инициализирует экземпляр класса DataSet
 
         Args:
             file_name (str): название вводимого файла csv
             vacancies_objects (List[Vacancy]): список состоящий из экземпляров класса Vacancy,
              содержащий только те строки, которые заполнены полностью, и не содержат пустые элементы.
+            stream (bool): если True, файл не загружается в память целиком (vacancies_objects = None),
+             вакансии читаются лениво через iter_vacancies()
+            byte_range (Tuple[int, int]): если указан, читаются только записи из этого диапазона байт файла
+             (см. csv_chunks.split_byte_ranges), используется процессами параллельной обработки одного файла
 
         >>> type(DataSet('vacancies_by_year.csv')).__name__
         'DataSet'
@@ -53,7 +69,54 @@ class DataSet:
         'vacancies_by_year.csv'
         """
         self.file_name = file_name
-        self.vacancies_objects = [Vacancy(vac) for vac in self.csv_filer(*self.csv_reader(file_name))]
+        self.byte_range = byte_range
+        self.vacancies_objects = None if stream else [Vacancy(vac) for vac in self.iter_dicts()]
+
+    def iter_vacancies(self) -> Iterator['Vacancy']:
+        """Лениво возвращает вакансии по одной, не храня весь файл в памяти.
+         Если данные уже загружены (stream=False), проходит по vacancies_objects
+
+        Returns:
+            Iterator[Vacancy]: экземпляры Vacancy для полностью заполненных строк файла
+        """
+        if self.vacancies_objects is not None:
+            yield from self.vacancies_objects
+            return
+        for vac in self.iter_dicts():
+            yield Vacancy(vac)
+
+    def iter_dicts(self) -> Iterator[Dict[str, str]]:
+        """Лениво считывает файл и возвращает очищенные полностью заполненные строки в виде словарей
+
+        Returns:
+            Iterator[Dict[str, str]]: словари, представляющие вакансию
+        """
+        if self.byte_range is not None:
+            yield from self.iter_filer(read_header(self.file_name), iter_range_rows(self.file_name, *self.byte_range))
+            return
+        with open(self.file_name, encoding='utf_8_sig', newline='') as file:
+            reader = csv.reader(file)
+            list_naming = next(reader, None)
+            if list_naming is None:
+                return
+            yield from self.iter_filer(list_naming, reader)
+
+    def to_columns(self) -> 'VacancyColumns':
+        """Собирает вакансии в колоночное хранилище VacancyColumns, не создавая объектов Vacancy
+
+        Returns:
+            VacancyColumns: вакансии файла в виде массивов numpy
+        """
+        columns = VacancyColumns()
+        if self.vacancies_objects is not None:
+            for vac in self.vacancies_objects:
+                columns.append(vac.name, vac.salary.salary_from, vac.salary.salary_to, vac.salary.salary_currency,
+                               vac.area_name, vac.published_at)
+        else:
+            for vac in self.iter_dicts():
+                columns.append(vac['name'], vac['salary_from'], vac['salary_to'], vac['salary_currency'],
+                               vac['area_name'], Vacancy.change_data(vac['published_at']))
+        return columns.freeze()
 
     def clean_string(self, raw_html):
         """Очищает строки от html тэгов и лишних пробелов
@@ -69,8 +132,7 @@ class DataSet:
         >>> data.clean_string("  Программист      1С (8.0)/Разработчик")
         'Программист 1С (8.0)/Разработчик'
         """
-        result = re.sub("<.*?>", '', raw_html)
-        return result if '\n' in raw_html else " ".join(result.split())
+        return clean_string(raw_html)
 
     def csv_reader(self, file_name: str) -> (list, list):
         """
@@ -120,9 +182,26 @@ class DataSet:
         >>> data.csv_filer(header, reader)
         []
         """
-        new_vacans_list = list(filter(lambda vac: (len(vac) == len(list_naming) and vac.count('') == 0), reader))
-        dict_vacans = [dict(zip(list_naming, map(self.clean_string, vac))) for vac in new_vacans_list]
-        return dict_vacans
+        return list(self.iter_filer(list_naming, reader))
+
+    def iter_filer(self, list_naming: list, reader) -> Iterator[Dict[str, str]]:
+        """Потоковый вариант csv_filer: по одной отдаёт очищенные вакансии из любого итератора строк
+
+        Args:
+            list_naming (list): список названий полей
+            reader (Iterable[List[str]]): строки csv, например csv.reader
+
+        Returns:
+            Iterator[Dict[str, str]]: словари, представляющие вакансию
+        """
+        fields_count = len(list_naming)
+        text_fields = [field for field in list_naming if field in self.text_fields]
+        for vac in reader:
+            if len(vac) == fields_count and '' not in vac:
+                dict_vac = dict(zip(list_naming, vac))
+                for field in text_fields:
+                    dict_vac[field] = clean_string(dict_vac[field])
+                yield dict_vac
 
 
 
@@ -135,6 +214,8 @@ class Vacancy:
         area_name (str): город вакансии
         published_at (int): год публикации
     """
+    __slots__ = ('name', 'salary', 'area_name', 'published_at')
+
     def __init__(self, dict_vac) -> object:
         """Инициализирует объект Vacancy
 
@@ -160,7 +241,25 @@ class Vacancy:
         self.area_name = dict_vac['area_name']
         self.published_at = self.change_data(dict_vac['published_at'])
 
-    def change_data(self, date_vac):
+    @classmethod
+    def from_fields(cls, name, salary, area_name, published_at):
+        """Создаёт Vacancy из уже разобранных полей, без словаря и разбора даты
+
+        Args:
+            name (str): название вакансии
+            salary (Salary): зарплата
+            area_name (str): город вакансии
+            published_at (int): год публикации
+
+        Returns:
+            Vacancy: вакансия
+        """
+        vac = cls.__new__(cls)
+        vac.name, vac.salary, vac.area_name, vac.published_at = name, salary, area_name, published_at
+        return vac
+
+    @staticmethod
+    def change_data(date_vac):
         """Приводит дату публикаци вакансии в формат гггг
 
         Returns:
@@ -179,9 +278,7 @@ class Vacancy:
         if date_vac.__class__.__name__ != 'str':
             raise TypeError('Argument must be string type')
         else:
-            return int(datetime.datetime.strptime(date_vac, '%Y-%m-%dT%H:%M:%S%z').strftime('%Y'))
-            # return int(date_vac.split('-').[0])
-            # return int(date_vac[:4])
+            return get_year(date_vac)
 
 
 class Salary:
@@ -191,8 +288,12 @@ class Salary:
             salary_from (str): верхняя граница вилки оклада
             salary_to (str):нижняя граница вилки оклада
             salary_currency (str): валюта оклада
+            salary_rub (float or None): среднее арифметическое вилки оклада в рублях, считается один раз при создании;
+             None, если валюты нет в currency_to_rub или границы не числа - тогда ошибка будет при convert_to_RUB
 
         """
+    __slots__ = ('salary_from', 'salary_to', 'salary_currency', 'salary_rub')
+
     def __init__(self, salary_from, salary_to, salary_currency):
         """Инициализирует объект Salary
 
@@ -212,12 +313,43 @@ class Salary:
         self.salary_from = salary_from
         self.salary_to = salary_to
         self.salary_currency = salary_currency
+        rate = currency_to_rub.get(salary_currency)
+        try:
+            self.salary_rub = None if rate is None else (float(salary_from) + float(salary_to)) / 2 * rate
+        except (TypeError, ValueError):
+            self.salary_rub = None
 
-    def convert_to_RUB(self) -> float:
-        """Конвертирует оклад в рубли
+    @classmethod
+    def from_columns(cls, salaries_from, salaries_to, currencies) -> List['Salary']:
+        """Создаёт зарплаты для целых столбцов: оклады в рублях считаются векторно через numpy,
+         без разбора строк и поиска курса для каждого объекта
 
         Args:
-            salary: среднее арифметическое между salary_from и salary_to(оклад)
+            salaries_from (Sequence[str or float]): нижние границы вилки оклада
+            salaries_to (Sequence[str or float]): верхние границы вилки оклада
+            currencies (Sequence[str]): валюты оклада
+
+        Returns:
+            List[Salary]: зарплаты в порядке столбцов
+
+        >>> [salary.convert_to_RUB() for salary in Salary.from_columns(['1000', 1000], [5000, '5000'], ['EUR', 'RUR'])]
+        [179700.0, 3000.0]
+        """
+        rates = np.array([currency_to_rub.get(currency, np.nan) for currency in currencies], dtype=np.float64)
+        salaries_rub = (np.asarray(salaries_from, dtype=np.float64) + np.asarray(salaries_to, dtype=np.float64)) \
+            / 2 * rates
+        salaries = []
+        for salary_from, salary_to, currency, salary_rub, rate in zip(salaries_from, salaries_to, currencies,
+                                                                       salaries_rub.tolist(), rates.tolist()):
+            salary = cls.__new__(cls)
+            salary.salary_from, salary.salary_to, salary.salary_currency = salary_from, salary_to, currency
+            salary.salary_rub = None if np.isnan(rate) else salary_rub
+            salaries.append(salary)
+        return salaries
+
+    def convert_to_RUB(self) -> float:
+        """Возвращает оклад в рублях, посчитанный при создании объекта. Для валюты, которой нет в currency_to_rub,
+         выбрасывает KeyError (а для нечисловых границ - ValueError), как и раньше, при конвертации, а не при создании
 
         Returns:
             оклад в рублях
@@ -232,67 +364,194 @@ class Salary:
 
         """
 
-        return (float(self.salary_from) + float(self.salary_to)) / 2 * currency_to_rub[self.salary_currency]
+        if self.salary_rub is None:
+            return (float(self.salary_from) + float(self.salary_to)) / 2 * currency_to_rub[self.salary_currency]
+        return self.salary_rub
+
+
+class VacancyColumns:
+    """Колоночное хранилище вакансий: зарплаты и годы в массивах numpy, названия, валюты и города - коды категорий.
+     Занимает на порядок меньше памяти, чем список Vacancy, и позволяет считать статистику векторно
+
+    Attributes:
+        name_codes (np.ndarray): коды названий вакансий, int32, индексы в names
+        names (List[str]): различные названия вакансий
+        salary_from (np.ndarray): нижние границы вилки оклада, float64
+        salary_to (np.ndarray): верхние границы вилки оклада, float64
+        currency_codes (np.ndarray): коды валют, int8, индексы в currencies
+        currencies (List[str]): названия валют
+        years (np.ndarray): год публикации, int16
+        city_codes (np.ndarray): коды городов, int32, индексы в cities
+        cities (List[str]): названия городов
+        indexes (dict(str: dict(str: int))): коды уже встреченных названий, валют и городов
+    """
+    array_fields = ('name_codes', 'salary_from', 'salary_to', 'currency_codes', 'years', 'city_codes')
+
+    def __init__(self):
+        """Инициализирует пустое хранилище, которое заполняется через append() и завершается freeze()"""
+        self.name_codes = array('i')
+        self.names = []
+        self.salary_from = array('d')
+        self.salary_to = array('d')
+        self.currency_codes = array('b')
+        self.currencies = []
+        self.years = array('h')
+        self.city_codes = array('i')
+        self.cities = []
+        self.indexes = {'names': {}, 'currencies': {}, 'cities': {}}
+
+    def get_code(self, category, value):
+        """Возвращает код значения в категории ('names', 'currencies' или 'cities'), добавляя новое значение"""
+        index = self.indexes[category]
+        if value not in index:
+            index[value] = len(index)
+            getattr(self, category).append(value)
+        return index[value]
+
+    def append(self, name, salary_from, salary_to, salary_currency, area_name, year):
+        """Добавляет одну вакансию
+
+        Args:
+            name (str): название вакансии
+            salary_from (str or float): нижняя граница вилки оклада
+            salary_to (str or float): верхняя граница вилки оклада
+            salary_currency (str): валюта оклада
+            area_name (str): город вакансии
+            year (int): год публикации
+        """
+        self.name_codes.append(self.get_code('names', name))
+        self.salary_from.append(float(salary_from))
+        self.salary_to.append(float(salary_to))
+        self.currency_codes.append(self.get_code('currencies', salary_currency))
+        self.years.append(year)
+        self.city_codes.append(self.get_code('cities', area_name))
+
+    def freeze(self):
+        """Переводит накопленные массивы в numpy без копирования
+
+        Returns:
+            VacancyColumns: self
+        """
+        self.name_codes = np.frombuffer(self.name_codes, dtype=np.int32)
+        self.salary_from = np.frombuffer(self.salary_from, dtype=np.float64)
+        self.salary_to = np.frombuffer(self.salary_to, dtype=np.float64)
+        self.currency_codes = np.frombuffer(self.currency_codes, dtype=np.int8)
+        self.years = np.frombuffer(self.years, dtype=np.int16)
+        self.city_codes = np.frombuffer(self.city_codes, dtype=np.int32)
+        return self
+
+    def save(self, directory):
+        """Сохраняет хранилище в папку: массивы в .npy, категории в categories.json
+
+        Args:
+            directory (str): папка кэша
+        """
+        os.makedirs(directory, exist_ok=True)
+        for field in self.array_fields:
+            np.save(os.path.join(directory, f'{field}.npy'), np.asarray(getattr(self, field)))
+        with open(os.path.join(directory, 'categories.json'), 'w', encoding='utf-8') as file:
+            json.dump({'names': self.names, 'currencies': self.currencies, 'cities': self.cities}, file,
+                      ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        """Загружает хранилище, сохранённое save(); массивы отображаются в память (mmap), а не читаются целиком
+
+        Args:
+            directory (str): папка кэша
+
+        Returns:
+            VacancyColumns: хранилище только для чтения
+        """
+        columns = cls()
+        for field in cls.array_fields:
+            setattr(columns, field, np.load(os.path.join(directory, f'{field}.npy'), mmap_mode='r'))
+        with open(os.path.join(directory, 'categories.json'), encoding='utf-8') as file:
+            categories = json.load(file)
+        columns.names, columns.currencies, columns.cities = \
+            categories['names'], categories['currencies'], categories['cities']
+        return columns
+
+    def __len__(self):
+        return len(self.name_codes)
+
+    def __getitem__(self, index):
+        """Возвращает вакансию с номером index в виде объекта Vacancy (для совместимости)"""
+        salary = Salary(float(self.salary_from[index]), float(self.salary_to[index]),
+                        self.currencies[self.currency_codes[index]])
+        return Vacancy.from_fields(self.names[self.name_codes[index]], salary, self.cities[self.city_codes[index]],
+                                   int(self.years[index]))
+
+    def __iter__(self):
+        """Возвращает все вакансии в виде объектов Vacancy, зарплаты создаются одним вызовом Salary.from_columns"""
+        salaries = Salary.from_columns(self.salary_from.tolist(), self.salary_to.tolist(),
+                                       [self.currencies[code] for code in self.currency_codes.tolist()])
+        for index, salary in enumerate(salaries):
+            yield Vacancy.from_fields(self.names[self.name_codes[index]], salary, self.cities[self.city_codes[index]],
+                                      int(self.years[index]))
+
+    def salary_to_rub(self) -> np.ndarray:
+        """Векторный аналог Salary.convert_to_RUB для всех вакансий
+
+        Returns:
+            np.ndarray: оклады в рублях
+        """
+        rates = np.array([currency_to_rub[currency] for currency in self.currencies], dtype=np.float64)
+        return (self.salary_from + self.salary_to) / 2 * rates[self.currency_codes]
 
 
-def get_dynamic_by_salary(vacancies: List[Vacancy], field: str, filter_name_vacancy: str = ''):
-    """Представляет динамику уровня зарплат по заданному полю для названия вакансии(необязательное поле)
+def get_dynamic_by_salary(vacancies: Iterable[Vacancy], field: str, filter_name_vacancy: str or List[str] = ''):
+    """Представляет динамику уровня зарплат по заданному полю для названия вакансии(необязательное поле).
+     Считается за один проход по вакансиям, список vacancies не изменяется
 
     Attributes:
-        vacancies (List[Vacancy]): список экземпляров объектов класса Vacancy
+        vacancies (Iterable[Vacancy]): экземпляры объектов класса Vacancy, список или поток
         field (str): название поля, по которому производится динамика
-        filter_name_vacancy (str): название профессий для которой производится обработка статистических данных
+        filter_name_vacancy (str or List[str]): название профессии или список названий (ProfessionMatcher),
+         для которых производится обработка статистических данных
 
     Returns:
         Dict(str or int: int): словарь, подставляющий стратистику ключ-значение поля(field),
          значение: среднее арифметическое зарплат вакансий по заданному значению названия поля
 
     """
-    by_salary = {}
+    matcher = ProfessionMatcher(filter_name_vacancy) if filter_name_vacancy else None
+    salary_sums, counts = {}, {}
     for vac in vacancies:
-        by_salary[vac.__getattribute__(field)] = [] if vac.__getattribute__(field) not in by_salary.keys() else \
-            by_salary[
-                vac.__getattribute__(field)]
-    if len(filter_name_vacancy) != 0:
-        for vac_name in filter_name_vacancy:
-            vacancies += list(filter(lambda vac: vac_name in vac.__getattribute__('name'), vacancies))
-
-    for vac in vacancies:
-        by_salary[vac.__getattribute__(field)].append(
-            vac.salary.convert_to_RUB())
-    for key in by_salary.keys():
-        by_salary[key] = 0 if len(by_salary[key]) == 0 else int(sum(by_salary[key]) // len(by_salary[key]))
-    return by_salary
+        key = getattr(vac, field)
+        if key not in counts:
+            salary_sums[key], counts[key] = 0, 0
+        if matcher is None or matcher.matches(vac.name):
+            salary_sums[key] += vac.salary.convert_to_RUB()
+            counts[key] += 1
+    return StatAccumulator.average(salary_sums, counts)
 
 
-def get_dynamic_by_count(vacancies: List[Vacancy], field: str, filter_name_vacancy: str = ''):
-    """Представляет динамику количества вакансий по заданному полю для вакансии по названию(необязательное поле)
+def get_dynamic_by_count(vacancies: Iterable[Vacancy], field: str, filter_name_vacancy: str or List[str] = ''):
+    """Представляет динамику количества вакансий по заданному полю для вакансии по названию(необязательное поле).
+     Считается за один проход по вакансиям, список vacancies не изменяется
 
     Attributes:
-        vacancies (List[Vacancy]): список экземпляров объектов класса Vacancy
+        vacancies (Iterable[Vacancy]): экземпляры объектов класса Vacancy, список или поток
         field (str): название поля, по которому производится динамика
-        filter_name_vacancy (str): название профессий для которой производится обработка статистических данных
+        filter_name_vacancy (str or List[str]): название профессии или список названий (ProfessionMatcher),
+         для которых производится обработка статистических данных
 
     Returns:
         dict(str or int: int): словарь, подставляющий стратистику ключи-все возможные значение поля(field),
          значение: количество вакансий по заданному значению названия поля,
-          для 'area_name'(город)-доля вакансий
+          для 'area_name'(город)-доля вакансий от всех вакансий
     """
-    by_count = {}
-    for vac in vacancies:
-        by_count[vac.__getattribute__(field)] = 0 if vac.__getattribute__(field) not in by_count.keys() else by_count[
-            vac.__getattribute__(field)]
-    new_list= []
-    if len(filter_name_vacancy) != 0:
-        for vac_name in filter_name_vacancy:
-            new_list = list(filter(lambda vac: vac_name in vac.__getattribute__('name'), vacancies))
-            vacancies += new_list
-
+    matcher = ProfessionMatcher(filter_name_vacancy) if filter_name_vacancy else None
+    by_count, vacancies_count = {}, 0
     for vac in vacancies:
-        by_count[vac.__getattribute__(field)] += 1
+        key = getattr(vac, field)
+        by_count.setdefault(key, 0)
+        vacancies_count += 1
+        if matcher is None or matcher.matches(vac.name):
+            by_count[key] += 1
     if field == 'area_name':
-        for key in by_count.keys():
-            by_count[key] = round(by_count[key] / len(data.vacancies_objects), 4)
+        by_count = {key: round(count / vacancies_count, 4) for key, count in by_count.items()}
     return by_count
 
 
@@ -345,6 +604,23 @@ class Report:
         self.statistics = [salary_by_year, salary_by_year_vac, count_by_year, count_by_year_vac, salary_by_city,
                            self.pers_by_city]
 
+    @classmethod
+    def from_accumulator(cls, stat, vac=""):
+        """Создаёт отчёт по статистике, собранной StatAccumulator
+
+        Args:
+            stat (StatAccumulator): собранная статистика
+            vac (str): название вакансии для которой предоставляется отчёт(необязательное поле)
+
+        Returns:
+            Report: отчёт
+        """
+        salary_by_year, count_by_year, salary_by_year_vac, count_by_year_vac, salary_by_city, pers_by_city = \
+            stat.get_statistics()
+        return cls(salary_by_year=salary_by_year, salary_by_year_vac=salary_by_year_vac, count_by_year=count_by_year,
+                   count_by_year_vac=count_by_year_vac, salary_by_city=salary_by_city, pers_by_city=pers_by_city,
+                   vac=vac)
+
     def аgenerate_image(self):
         """Генерирует изображение в директории report под именем report.png, с 4мя графиками: гистограммами 'Уровень зарплат по годам',
          'Количество вакансий по годам', 'Уровень зарплат по городам' и круговой диаграммой 'Количество вакансий по городам'
@@ -554,43 +830,211 @@ def get_statistic(result_list, index: int, is_reversed=False, slice=0):
 #     exit_from_file('Нет данных')
 # dict_cities = {}
 
+class StatAccumulator:
+    """Класс, собирающий все шесть статистик за один проход по вакансиям
+
+    Attributes:
+        matcher (ProfessionMatcher): отбор вакансий выбранной профессии по названию
+        vacancies_count (int): количество обработанных вакансий
+        salary_sum_by_year (dict(int: float)): сумма зарплат в рублях по годам
+        count_by_year (dict(int: int)): количество вакансий по годам
+        salary_sum_by_year_vac (dict(int: float)): сумма зарплат по годам для выбранной профессии
+        count_by_year_vac (dict(int: int)): количество вакансий по годам для выбранной профессии
+        salary_sum_by_city (dict(str: float)): сумма зарплат в рублях по городам
+        count_by_city (dict(str: int)): количество вакансий по городам
+    """
+    def __init__(self, vacancy_name=''):
+        """Инициализирует пустой аккумулятор
+
+        Args:
+            vacancy_name (str or List[str]): название профессии или список названий
+        """
+        self.matcher = ProfessionMatcher(vacancy_name)
+        self.vacancies_count = 0
+        self.salary_sum_by_year = {}
+        self.count_by_year = {}
+        self.salary_sum_by_year_vac = {}
+        self.count_by_year_vac = {}
+        self.salary_sum_by_city = {}
+        self.count_by_city = {}
+
+    def add(self, vac):
+        """Учитывает одну вакансию во всех статистиках
+
+        Args:
+            vac (Vacancy): вакансия
+        """
+        salary = vac.salary.convert_to_RUB()
+        year, city = vac.published_at, vac.area_name
+        self.vacancies_count += 1
+        self.salary_sum_by_year[year] = self.salary_sum_by_year.get(year, 0) + salary
+        self.count_by_year[year] = self.count_by_year.get(year, 0) + 1
+        self.salary_sum_by_city[city] = self.salary_sum_by_city.get(city, 0) + salary
+        self.count_by_city[city] = self.count_by_city.get(city, 0) + 1
+        if year not in self.count_by_year_vac:
+            self.salary_sum_by_year_vac[year], self.count_by_year_vac[year] = 0, 0
+        if self.matcher.matches(vac.name):
+            self.salary_sum_by_year_vac[year] += salary
+            self.count_by_year_vac[year] += 1
+
+    def add_all(self, vacancies):
+        """Учитывает все вакансии из итерируемого объекта (списка или потока DataSet.iter_vacancies())
+
+        Args:
+            vacancies (Iterable[Vacancy]): вакансии
+
+        Returns:
+            StatAccumulator: self, для цепочки вызовов
+        """
+        for vac in vacancies:
+            self.add(vac)
+        return self
+
+    def add_columns(self, columns):
+        """Векторно учитывает все вакансии колоночного хранилища: суммы и количества
+         считаются через np.bincount по кодам годов и городов
+
+        Args:
+            columns (VacancyColumns): вакансии
+
+        Returns:
+            StatAccumulator: self, для цепочки вызовов
+        """
+        salary = columns.salary_to_rub()
+        is_vac = np.array([self.matcher.matches(name) for name in columns.names], dtype=bool)[columns.name_codes]
+        years, year_codes = np.unique(columns.years, return_inverse=True)
+        by_year = (np.bincount(year_codes, weights=salary, minlength=len(years)),
+                   np.bincount(year_codes, minlength=len(years)),
+                   np.bincount(year_codes, weights=salary * is_vac, minlength=len(years)),
+                   np.bincount(year_codes, weights=is_vac, minlength=len(years)))
+        for year, salary_sum, count, salary_sum_vac, count_vac in zip(years.tolist(), *by_year):
+            self.salary_sum_by_year[year] = self.salary_sum_by_year.get(year, 0) + salary_sum
+            self.count_by_year[year] = self.count_by_year.get(year, 0) + int(count)
+            self.salary_sum_by_year_vac[year] = self.salary_sum_by_year_vac.get(year, 0) + salary_sum_vac
+            self.count_by_year_vac[year] = self.count_by_year_vac.get(year, 0) + int(count_vac)
+        city_sums = np.bincount(columns.city_codes, weights=salary, minlength=len(columns.cities))
+        city_counts = np.bincount(columns.city_codes, minlength=len(columns.cities))
+        for city, salary_sum, count in zip(columns.cities, city_sums, city_counts):
+            self.salary_sum_by_city[city] = self.salary_sum_by_city.get(city, 0) + salary_sum
+            self.count_by_city[city] = self.count_by_city.get(city, 0) + int(count)
+        self.vacancies_count += len(columns)
+        return self
+
+    def merge(self, other):
+        """Добавляет к текущей статистике частичную статистику другого аккумулятора,
+         например посчитанную другим процессом по своей части файла. Суммы и количества складываются,
+         поэтому результат не зависит от того, как данные были разбиты на части
+
+        Args:
+            other (StatAccumulator): частичная статистика
+
+        Returns:
+            StatAccumulator: self, для цепочки вызовов
+        """
+        self.vacancies_count += other.vacancies_count
+        for own, partial in ((self.salary_sum_by_year, other.salary_sum_by_year),
+                             (self.count_by_year, other.count_by_year),
+                             (self.salary_sum_by_year_vac, other.salary_sum_by_year_vac),
+                             (self.count_by_year_vac, other.count_by_year_vac),
+                             (self.salary_sum_by_city, other.salary_sum_by_city),
+                             (self.count_by_city, other.count_by_city)):
+            for key, value in partial.items():
+                own[key] = own.get(key, 0) + value
+        return self
+
+    @staticmethod
+    def average(sums, counts):
+        """Возвращает среднее по каждому ключу counts, 0 если вакансий нет"""
+        return {key: 0 if counts[key] == 0 else int(sums[key] // counts[key]) for key in counts}
+
+    def salary_by_year(self):
+        return self.average(self.salary_sum_by_year, self.count_by_year)
+
+    def salary_by_year_vac(self):
+        return self.average(self.salary_sum_by_year_vac, self.count_by_year_vac)
+
+    def top_cities(self):
+        """Возвращает уровень зарплат и долю вакансий для 10 первых городов (city_ranking.rank_cities)"""
+        return rank_cities(self.count_by_city, self.salary_sum_by_city, self.vacancies_count)
+
+    def print_statistic(self):
+        """Выводит в консоль все шесть статистик"""
+        print_statistic(self.salary_by_year().items(), 0, 'Динамика уровня зарплат по годам: ')
+        print_statistic(self.count_by_year.items(), 0, 'Динамика количества вакансий по годам: ')
+        print_statistic(self.salary_by_year_vac().items(), 0,
+                        'Динамика уровня зарплат по годам для выбранной профессии: ')
+        print_statistic(self.count_by_year_vac.items(), 0,
+                        'Динамика количества вакансий по годам для выбранной профессии: ')
+        salary_by_city, pers_by_city = self.top_cities()
+        print('Уровень зарплат по городам (в порядке убывания): ' + str(salary_by_city))
+        print('Доля вакансий по городам (в порядке убывания): ' + str(pers_by_city))
+
+    def get_statistics(self):
+        """Возвращает статистику в том виде, в котором её принимает Report
+
+        Returns:
+            Tuple: salary_by_year, count_by_year, salary_by_year_vac, count_by_year_vac, salary_by_city, pers_by_city
+        """
+        return (get_statistic(self.salary_by_year().items(), 0),
+                get_statistic(self.count_by_year.items(), 0),
+                get_statistic(self.salary_by_year_vac().items(), 0),
+                get_statistic(self.count_by_year_vac.items(), 0),
+                *self.top_cities())
+
+
+def get_partial_stat(file_name, vacancy_name, byte_range=None):
+    """Считает частичную статистику по файлу без вывода в консоль, для объединения через merge_partial_stats
+
+    Args:
+        file_name (str): название файла csv
+        vacancy_name (str or List[str]): название профессии или список названий
+        byte_range (Tuple[int, int]): диапазон байт файла, если считается только его часть
+
+    Returns:
+        StatAccumulator: суммы и количества по годам и городам
+    """
+    data_set = DataSet(file_name, stream=True, byte_range=byte_range)
+    return StatAccumulator(vacancy_name).add_all(data_set.iter_vacancies())
+
+
+def merge_partial_stats(partial_stats, vacancy_name):
+    """Объединяет частичные статистики процессов в одну
+
+    Args:
+        partial_stats (Iterable[StatAccumulator]): частичные статистики
+        vacancy_name (str or List[str]): название профессии или список названий
+
+    Returns:
+        StatAccumulator: общая статистика
+    """
+    stat = StatAccumulator(vacancy_name)
+    for partial_stat in partial_stats:
+        stat.merge(partial_stat)
+    return stat
+
+
 def get_all_stat(file_name, vacancy_name):
-    global vac, pers_by_city, data, pers_by_city
-    data = DataSet(file_name)
-    if len(data.vacancies_objects) == 0:
+    """Собирает всю статистику за один проход по файлу, не загружая его в память целиком.
+     Если для файла есть актуальный кэш (columnar_cache.py), статистика считается по нему без разбора csv
+
+    Args:
+        file_name (str): название файла csv
+        vacancy_name (str or List[str]): название профессии или список названий
+
+    Returns:
+        Tuple: salary_by_year, count_by_year, salary_by_year_vac, count_by_year_vac, salary_by_city, pers_by_city
+    """
+    global data
+    data = DataSet(file_name, stream=True)
+    columns = load_columns(file_name)
+    if columns is not None:
+        stat = StatAccumulator(vacancy_name).add_columns(columns)
+    else:
+        stat = StatAccumulator(vacancy_name).add_all(data.iter_vacancies())
+    if stat.vacancies_count == 0:
         exit_from_file('Нет данных')
-    dict_cities = {}
-    for vac in data.vacancies_objects:
-        if vac.area_name not in dict_cities.keys():
-            dict_cities[vac.area_name] = 0
-        dict_cities[vac.area_name] += 1
-    needed_vacancies_objects = list(
-        filter(lambda vac: int(len(data.vacancies_objects) * 0.01) <= dict_cities[vac.area_name],
-               data.vacancies_objects))
-    print_statistic(get_dynamic_by_salary(data.vacancies_objects, 'published_at').items(), 0,
-                    'Динамика уровня зарплат по годам: ')
-    print_statistic(get_dynamic_by_count(data.vacancies_objects, "published_at").items(), 0,
-                    'Динамика количества вакансий по годам: ')
-    print_statistic(get_dynamic_by_salary(data.vacancies_objects, 'published_at', vacancy_name).items(), 0,
-                    'Динамика уровня зарплат по годам для выбранной профессии: ')
-    print_statistic(get_dynamic_by_count(data.vacancies_objects, 'published_at', vacancy_name).items(), 0,
-                    'Динамика количества вакансий по годам для выбранной профессии: ')
-    print_statistic(get_dynamic_by_salary(needed_vacancies_objects, 'area_name').items(), 1,
-                    'Уровень зарплат по городам (в порядке убывания): ', True, 10)
-    print_statistic(get_dynamic_by_count(needed_vacancies_objects, 'area_name').items(), 1,
-                    'Доля вакансий по городам (в порядке убывания): ', True, 10)
-    salary_by_year = get_statistic(get_dynamic_by_salary(data.vacancies_objects, 'published_at').items(), 0)
-    count_by_year = get_statistic(get_dynamic_by_count(data.vacancies_objects, "published_at").items(), 0)
-    salary_by_year_vac = get_statistic(
-        get_dynamic_by_salary(data.vacancies_objects, 'published_at', vacancy_name).items(), 0)
-    count_by_year_vac = get_statistic(
-        get_dynamic_by_count(data.vacancies_objects, 'published_at', vacancy_name).items(),
-        0)
-    salary_by_city = get_statistic(get_dynamic_by_salary(needed_vacancies_objects, 'area_name').items(), 1, False,
-                                   slice=10)
-    pers_by_city = get_statistic(get_dynamic_by_count(needed_vacancies_objects, 'area_name').items(), 1, True, slice=10)
-
-    return salary_by_year, count_by_year,salary_by_year_vac,count_by_year_vac,salary_by_city,pers_by_city
+    stat.print_statistic()
+    return stat.get_statistics()
 
 
 # salary_by_year, count_by_year,salary_by_year_vac,count_by_year_vac,salary_by_city,pers_by_city = get_all_stat(file_name)
@@ -606,7 +1050,7 @@ def get_all_stat(file_name, vacancy_name):
 # report.generate_pdf()
 
 if __name__ == "__main__":
-    vacancy_name = ['web develop', 'веб разработчик', 'web разработчик', 'web programmer', 'web программист', 'веб программист', 'битрикс разработчик', 'bitrix разработчик', 'drupal разработчик', 'cms разработчик', 'wordpress разработчик', 'wp разработчик', 'joomla разработчик', 'drupal developer', 'cms developer', 'wordpress developer', 'wp developer', 'joomla developer']
+    vacancy_name = web_developer
     file_name = 'vacancies_with_skills.csv'
     salary_by_year, count_by_year,salary_by_year_vac,count_by_year_vac,salary_by_city,pers_by_city = get_all_stat(file_name, vacancy_name)
     report = Report(salary_by_year=salary_by_year,
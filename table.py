@@ -1,12 +1,15 @@
 import cProfile
-import os, re, csv
-import datetime
+import os, csv
 import cProfile
 from pstats import Stats, SortKey
 from pstats import Stats
 from typing import Dict, List, Tuple
 from prettytable import PrettyTable, ALL
 
+from columnar_cache import read_rows_cached
+from date_parser import get_date, parse_published_at
+from text_cleaner import clean_string, clean_column
+
 
 class DataSet:
     """Класс представляющий данные из файла .csv
@@ -15,8 +18,11 @@ class DataSet:
                 file_name (str): название вводимого файла csv
                 vacancies_objects (List[Vacancy]): список состоящий из экземпляров класса Vacancy,
                  содержащий только те строки, которые заполнены полностью, и не содержат пустые элементы.
+                text_fields (Tuple[str]): текстовые поля, которые очищаются от html тэгов и лишних пробелов
 
         """
+    text_fields = ('name', 'description', 'key_skills', 'employer_name', 'area_name')
+
     def __init__(self, file_name: str):
         """Инициализирует экземпляр класса DataSet
 
@@ -37,8 +43,7 @@ class DataSet:
                 Returns:
                     str: строка без лишних пробелов и html тэгов
                 """
-        clean_string = re.sub('<.*?>', '', raw)
-        return clean_string if '\n' in raw else " ".join(clean_string.split())
+        return clean_string(raw)
 
     def csv_reader(self, file_name: str) -> Tuple[List[str], List[List[str]]]:
         """Считывает записи из файла file_name
@@ -51,6 +56,9 @@ class DataSet:
                     список списков, где каждый вложенный список содержит все поля вакансии)
 
                 """
+        cached = read_rows_cached(file_name)
+        if cached is not None:
+            return cached
         reader = csv.reader(open(file_name, encoding='utf_8_sig'))
         data_base = [line for line in reader]
         fields = data_base[0]
@@ -69,7 +77,11 @@ class DataSet:
                     List[Dict[str, str]]: список словарей, представляющих вакансию, где ключи содержат все поля вакансии
                 """
         filtered_vacancies = list(filter(lambda vac: (len(vac) == len(fields) and vac.count('') == 0), vacancies_list))
-        dict_vacans = [dict(zip(fields, map(self.clean_string, vac))) for vac in filtered_vacancies]
+        columns = list(zip(*filtered_vacancies))
+        for i, field in enumerate(fields):
+            if field in self.text_fields and columns:
+                columns[i] = clean_column(columns[i])
+        dict_vacans = [dict(zip(fields, vac)) for vac in zip(*columns)]
         if (len(dict_vacans) == 0):
             print('Нет данных')
             exit()
@@ -272,8 +284,7 @@ class InputConect:
         def check_data(key):
             """переводит поле "published_at" в формат dd.mm.YYYY
             """
-            result[key] = datetime.datetime.strptime(getattr(row, key), '%Y-%m-%dT%H:%M:%S%z').strftime(
-                '%d.%m.%Y')
+            result[key] = get_date(getattr(row, key))
 
 
 
@@ -314,8 +325,7 @@ class InputConect:
         'Премиум-вакансия': lambda data_vacancies, par_value: [vac for vac in data_vacancies
                                                                if par_value == translation[vac.premium]],
         'Дата публикации вакансии': lambda data_vacancies, par_value: [vac for vac in data_vacancies
-                                                                       if par_value ==
-               datetime.datetime.strptime(vac.published_at, '%Y-%m-%dT%H:%M:%S%z').strftime('%d.%m.%Y')],
+                                                                       if par_value == get_date(vac.published_at)],
 
         'Название': lambda data_vacancies, par_value: [vac for vac in data_vacancies if par_value == vac.name],
         'Название региона': lambda data_vacancies, par_value: [vac for vac in data_vacancies if
@@ -329,7 +339,7 @@ class InputConect:
         'Оклад': lambda vac: dict_currency_to_rub[vac.salary.salary_currency] * (float(vac.salary.salary_from)
                                                                                  + float(vac.salary.salary_to)) / 2,
         'Опыт работы': lambda vac: rang_experience_id[vac.experience_id],
-        'Дата публикации вакансии': lambda vac: datetime.datetime.strptime(vac.published_at, '%Y-%m-%dT%H:%M:%S%z')
+        'Дата публикации вакансии': lambda vac: parse_published_at(vac.published_at)
     }
 
     def data_sort(self) -> list:
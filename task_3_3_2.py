@@ -1,25 +1,26 @@
+import os
+
 import pandas as pd
-import numpy as np
+
+from columnar_cache import read_csv_cached
+from currency_convert import convert_salary, daily_store_name, load_currency_table, load_daily_rates
+from date_parser import get_months
 
 
 def create_vacancies(file_name):
     print('Запуск формирования файла по вакансиям')
     pd.set_option('expand_frame_repr', False)
 
-    currency_data = pd.read_csv('currencies.csv')
-    currency_data = currency_data.set_index('date')
+    currency_data = load_currency_table('currencies.csv')
+    daily_rates = load_daily_rates(daily_store_name) if os.path.exists(daily_store_name) else None
     print('Подгрузка файла по валютам')
-    print(currency_data.head())
-    currency = list(currency_data.columns)
+    print(currency_data.head() if daily_rates is None else daily_rates.head())
 
-    df = pd.read_csv(file_name)
+    df = read_csv_cached(file_name)
     print('Открытие файла по вакансиям')
     df.salary_from = df[['salary_from', 'salary_to']].mean(axis=1)
-    df['date'] = df.published_at.apply(lambda z: z[:7])
-    df['salary_from'] = df.apply(
-        lambda x: float(x['salary_from'] * currency_data.at[x['date'], x['salary_currency']])
-        if (x['salary_currency'] != 'RUR' and not np.isnan(x['salary_from']))
-        else x['salary_from'], axis=1)
+    df['date'] = get_months(df.published_at)
+    df['salary_from'] = convert_salary(df, currency_data, salary='salary_from', daily_rates=daily_rates)
 
     df = df.drop(['salary_to', 'date', 'salary_currency'], axis=1).rename(columns={'salary_from': 'salary'})
     # df.head(100).to_csv('first100vacancies.csv', index=False)
@@ -1,11 +1,45 @@
+import csv
+import importlib.util
+import itertools
+import math
+import os
+import shutil
+import sqlite3 as sql
+import tempfile
+from datetime import datetime, timedelta
 from unittest import TestCase, main
-from statistics import Salary, DataSet
+from unittest.mock import patch
 
+import numpy as np
+import pandas as pd
+import requests
+
+import columnar_cache
+import csv_chunks
+import load_vac_from_hh
+import vacancy_db
+from cbr_rates import fetch_currency_days, parse_daily_rates, parse_dynamic_rates, sync_daily_rates
+from city_ranking import rank_cities
+from currency_convert import convert_salary, load_daily_rates
+from date_parser import get_year, get_date, parse_published_at
+from hh_client import HHClient
+from http_cache import HTTPCache
+from profession_matcher import ProfessionMatcher
+from shared_stat_pool import SharedStatPool
+from statistics import Salary, DataSet, Vacancy, StatAccumulator, VacancyColumns, get_dynamic_by_salary, \
+    get_dynamic_by_count, get_partial_stat
+from text_cleaner import clean_string, clean_column
 
 class SalaryTest(TestCase):
-    def checkTypeSalary(self):
+    def test_type_salary(self):
         self.assertEqual(type(Salary(10, 20, 'RUB')).__name__, 'Salary')
 
+    def test_unknown_currency_fails_on_convert(self):
+        salaries = [Salary(10, 20, 'XYZ')] + Salary.from_columns([10], [20], ['XYZ'])
+        for salary in salaries:
+            with self.assertRaises(KeyError):
+                salary.convert_to_RUB()
+
     def test_salary_to(self):
         self.assertEqual(Salary(20000, 40000, 'RUR').salary_to, 40000)
 
@@ -24,6 +58,11 @@ class SalaryTest(TestCase):
     def test_salary_to_RUB_kgs(self):
         self.assertEqual(Salary(1000, 5000, 'KGS').convert_to_RUB(), 2280.0)
 
+    def test_from_columns_same_as_salary(self):
+        columns = (['1000.5', '20000', '1000'], ['5000', '40000.0', '5000'], ['EUR', 'RUR', 'KGS'])
+        self.assertEqual([salary.convert_to_RUB() for salary in Salary.from_columns(*columns)],
+                         [Salary(*fields).convert_to_RUB() for fields in zip(*columns)])
+
 
 class DataSetTest(TestCase):
     data = DataSet('test.csv')
@@ -50,5 +89,599 @@ class DataSetTest(TestCase):
                                                            'published_at': '2007-12-04T16:28:52+0300'}])
 
 
+class StatAccumulatorTest(TestCase):
+    vacancies = [Vacancy({'name': 'Программист баз данных', 'salary_from': '36000.0', 'salary_to': '50000.0',
+                          'salary_currency': 'RUR', 'area_name': 'Москва', 'published_at': '2007-12-04T11:27:27+0300'}),
+                 Vacancy({'name': 'Аналитик', 'salary_from': '1000', 'salary_to': '3000',
+                          'salary_currency': 'EUR', 'area_name': 'Казань', 'published_at': '2008-12-04T11:27:27+0300'})]
+
+    def test_salary_by_year(self):
+        stat = StatAccumulator('Программист').add_all(self.vacancies)
+        self.assertEqual(stat.salary_by_year(), {2007: 43000, 2008: 119800})
+
+    def test_count_by_year_vac(self):
+        stat = StatAccumulator('Программист').add_all(self.vacancies)
+        self.assertEqual(stat.count_by_year_vac, {2007: 1, 2008: 0})
+
+    def test_pers_by_city(self):
+        stat = StatAccumulator('Программист').add_all(self.vacancies)
+        self.assertEqual(stat.top_cities()[1], {'Москва': 0.5, 'Казань': 0.5})
+
+    def test_merge_partial_stats(self):
+        first = StatAccumulator('Программист').add_all(self.vacancies[:1])
+        second = StatAccumulator('Программист').add_all(self.vacancies[1:])
+        self.assertEqual(first.merge(second).get_statistics(),
+                         StatAccumulator('Программист').add_all(self.vacancies).get_statistics())
+
+    def test_add_columns_same_as_add_all(self):
+        columns = VacancyColumns()
+        for vac in self.vacancies:
+            columns.append(vac.name, vac.salary.salary_from, vac.salary.salary_to, vac.salary.salary_currency,
+                           vac.area_name, vac.published_at)
+        columns.freeze()
+        self.assertEqual(StatAccumulator('Программист').add_columns(columns).get_statistics(),
+                         StatAccumulator('Программист').add_all(self.vacancies).get_statistics())
+
+
+class DynamicTest(TestCase):
+    vacancies = StatAccumulatorTest.vacancies
+
+    def test_salary_by_year_vac(self):
+        vacancies = list(self.vacancies)
+        self.assertEqual(get_dynamic_by_salary(vacancies, 'published_at', ['программист', 'разработчик']),
+                         {2007: 43000, 2008: 0})
+        self.assertEqual(vacancies, self.vacancies)
+
+    def test_count_by_city_not_growing(self):
+        for _ in range(2):
+            self.assertEqual(get_dynamic_by_count(self.vacancies, 'area_name', 'Программист'),
+                             {'Москва': 0.5, 'Казань': 0.0})
+        self.assertEqual(len(self.vacancies), 2)
+
+
+class ProfessionMatcherTest(TestCase):
+    matcher = ProfessionMatcher({'web': ['web develop', 'web программист'], 'cms': ['wordpress developer']})
+
+    def test_matches_ignore_case(self):
+        self.assertTrue(self.matcher.matches('Senior WEB Developer'))
+
+    def test_not_matches(self):
+        self.assertFalse(self.matcher.matches('Аналитик'))
+
+    def test_classify_several_groups(self):
+        self.assertEqual(self.matcher.classify('Web developer / WordPress developer'), {'web', 'cms'})
+
+    def test_empty_patterns(self):
+        self.assertFalse(ProfessionMatcher([]).matches('web developer'))
+
+
+class CityRankingTest(TestCase):
+    def test_threshold_and_top(self):
+        counts = {'Москва': 60, 'Казань': 30, 'Пермь': 9, 'Тверь': 1}
+        sums = {'Москва': 60 * 100.0, 'Казань': 30 * 300.0, 'Пермь': 9 * 200.0, 'Тверь': 1000.0}
+        self.assertEqual(rank_cities(counts, sums, 200, k=2),
+                         ({'Казань': 300, 'Пермь': 200}, {'Москва': 0.3, 'Казань': 0.15}))
+
+    def test_salary_count_without_rates(self):
+        self.assertEqual(rank_cities({'Москва': 4}, {'Москва': 300.0}, 4, {'Москва': 2})[0], {'Москва': 150})
+
+
+class CsvChunksTest(TestCase):
+    rows = [['name', 'description', 'salary_from', 'area_name'],
+            ['Программист', 'Строка 1\nстрока "2" с кавычками\n\n"""', '65000', 'Москва'],
+            ['Аналитик', '', '', 'NA'],
+            ['Web developer', '"Цитата", затем\r\nперевод строки', '1000.5', 'Казань'],
+            ['Тестировщик', 'ровно "' + 'x' * 20 + '"', '30000', 'Пермь']]
+
+    def setUp(self):
+        file, self.file_name = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(file, 'w', encoding='utf-8', newline='') as csv_file:
+            csv.writer(csv_file).writerows(self.rows)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def test_ranges_same_as_csv_reader(self):
+        with open(self.file_name, encoding='utf-8', newline='') as file:
+            expected = list(csv.reader(file))[1:]
+        for size in (3, 7, 64):
+            for parts in (1, 2, 3, 4, 10):
+                with patch('csv_chunks.block_size', size):
+                    ranges = csv_chunks.split_byte_ranges(self.file_name, parts)
+                rows = [row for byte_range in ranges for row in csv_chunks.iter_range_rows(self.file_name, *byte_range)]
+                self.assertEqual(rows, expected, f'block_size={size}, parts={parts}')
+
+
+class ColumnarCacheTest(TestCase):
+    def test_rows_cache_same_as_csv(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_name = os.path.join(directory, 'vacancies.csv')
+        rows = [['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'],
+                ['Программист', '65000', '', 'RUR', 'NA', '2007-12-04T11:27:27+0300'],
+                ['Аналитик', '1000', '3000', 'EUR', 'null', '2008-12-04T11:27:27+0300'],
+                ['Тестировщик', '2000', '3000', 'None', 'N/A', '2008-12-04T11:27:27+0300']]
+        with open(file_name, 'w', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows(rows)
+        self.assertIsNone(columnar_cache.read_rows_cached(file_name))
+        columnar_cache.convert(file_name)
+        self.assertEqual(columnar_cache.read_rows_cached(file_name), (rows[0], rows[1:]))
+
+    def test_extra_fields_do_not_break_convert(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_name = os.path.join(directory, 'vacancies.csv')
+        rows = [['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'],
+                ['Программист', '65000', '', 'RUR', 'Москва', '2007-12-04T11:27:27+0300'],
+                ['Аналитик', '1000', '3000', 'EUR', 'Москва', '2008-12-04T11:27:27+0300', 'лишнее']]
+        with open(file_name, 'w', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows(rows)
+        columnar_cache.convert(file_name)
+        for kind in ('columns', 'frame', 'rows'):
+            self.assertTrue(columnar_cache.is_valid(file_name, kind))
+        self.assertEqual(columnar_cache.read_rows_cached(file_name), (rows[0], rows[1:2]))
+
+
+class SharedStatPoolTest(TestCase):
+    header = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+    def write_csv(self, rows):
+        file, file_name = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(file, 'w', encoding='utf-8', newline='') as csv_file:
+            csv.writer(csv_file).writerows([self.header] + rows)
+        self.addCleanup(os.remove, file_name)
+        return file_name
+
+    def test_run_same_as_partial_stat(self):
+        cities = ['Москва', 'Казань', 'Пермь']
+        file_name = self.write_csv([[f'Программист {i}' if i % 3 else 'Аналитик', 1000 * i, 2000 * i,
+                                     'EUR' if i % 4 == 0 else 'RUR', cities[i % 3],
+                                     f'{2005 + i % 7}-12-04T11:27:27+0300'] for i in range(1, 60)])
+        with SharedStatPool(workers=2) as pool:
+            stat = pool.run(file_name, 'Программист', parts=5)
+        self.assertEqual(stat.get_statistics(), get_partial_stat(file_name, 'Программист').get_statistics())
+
+    def test_worker_error_is_raised(self):
+        file_name = self.write_csv([['Программист', '100', '200', 'XYZ', 'Москва', '2007-12-04T11:27:27+0300']])
+        with SharedStatPool(workers=2) as pool:
+            with self.assertRaises(KeyError):
+                pool.run(file_name, 'Программист', parts=2)
+            self.assertEqual(pool.run(self.write_csv([['Программист', '100', '200', 'RUR', 'Москва',
+                                                       '2007-12-04T11:27:27+0300']]), '').count_by_year, {2007: 1})
+
+    def test_dead_worker_does_not_hang(self):
+        file_name = self.write_csv([['Программист', '100', '200', 'RUR', 'Москва', '2007-12-04T11:27:27+0300']])
+        with SharedStatPool(workers=2) as pool:
+            pool.processes[0].kill()
+            pool.processes[0].join()
+            with self.assertRaises(RuntimeError):
+                pool.run(file_name, 'Программист')
+
+
+class SummaryTablesTest(TestCase):
+    def make_chunk(self, start, rows):
+        df = pd.DataFrame(rows, columns=['name', 'salary', 'area_name', 'date'])
+        df.index = range(start, start + len(df))
+        df = vacancy_db.add_year_column(df)
+        df['vacancy_key'] = [f'key{index}' for index in df.index]
+        return df
+
+    def test_incremental_same_as_group_by(self):
+        con = sql.connect(':memory:')
+        chunks = [self.make_chunk(0, [['Программист', 100.0, 'Москва', '2007-01'],
+                                      ['Аналитик', None, 'Казань', '2007-05'],
+                                      ['Программист', 300.0, 'Москва', '2008-02']]),
+                  self.make_chunk(3, [['Аналитик', 50.0, 'Москва', '2007-03'],
+                                      ['Программист', 70.0, 'Пермь', '2008-12'],
+                                      ['Программист', None, 'Казань', '2009-01']])]
+        for table in ('vacancies', 'vacs_with_prof'):
+            vacancy_db.create_summary_tables(con, table)
+            for chunk in chunks:
+                with con:
+                    vacancy_db.insert_vacancies(chunk, con, table)
+            for summary, key, _ in vacancy_db.summary_tables[table]:
+                expected = con.execute(f'SELECT {key}, TOTAL(salary), COUNT(salary), COUNT(*) FROM {table} '
+                                       f'GROUP BY {key} ORDER BY {key}').fetchall()
+                self.assertEqual(con.execute(f'SELECT * FROM {summary} ORDER BY {key}').fetchall(), expected)
+                self.assertEqual(len(expected), 3)
+
+    def test_rebuilt_after_drop(self):
+        con = sql.connect(':memory:')
+        vacancy_db.create_summary_tables(con, 'vacancies')
+        with con:
+            vacancy_db.insert_vacancies(self.make_chunk(0, [['Программист', 100.0, 'Москва', '2007-01'],
+                                                            ['Аналитик', 200.0, 'Казань', '2008-05']]),
+                                        con, 'vacancies')
+        con.execute('DROP TABLE vacancies')
+        vacancy_db.create_summary_tables(con, 'vacancies')
+        self.assertEqual(con.execute('SELECT * FROM year_stats').fetchall(), [])
+        with con:
+            vacancy_db.insert_vacancies(self.make_chunk(2, [['Программист', 70.0, 'Пермь', '2008-12']]),
+                                        con, 'vacancies')
+        self.assertEqual(con.execute('SELECT * FROM year_stats').fetchall(), [(2008, 70.0, 1, 1)])
+        self.assertEqual(con.execute('SELECT * FROM city_stats').fetchall(), [('Пермь', 70.0, 1, 1)])
+
+
+class LoadCsvTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.file_name = os.path.join(directory, 'vacancies.csv')
+        pd.DataFrame({'name': ['Программист', 'Аналитик', 'Программист', 'Тестировщик'],
+                      'salary': [100.0, 200.0, None, 300.0],
+                      'area_name': ['Москва', 'Казань', 'Москва', 'Пермь'],
+                      'published_at': ['2007-12-04T11:27:27+0300', '2008-01-04T11:27:27+0300',
+                                       '2007-05-04T11:27:27+0300', '2008-02-04T11:27:27+0300']}) \
+            .to_csv(self.file_name, index=False)
+        self.con = sql.connect(os.path.join(directory, 'vacancy_db'))
+        self.addCleanup(self.con.close)
+        self.prepared = []
+
+    def prepare(self, df):
+        self.prepared.append(len(df))
+        df = df.dropna(subset=['salary']).copy()
+        df['date'] = df['published_at'].str[:7]
+        return df[['name', 'salary', 'area_name', 'date']]
+
+    def get_state(self):
+        return [self.con.execute(query).fetchall() for query in
+                ('SELECT COUNT(*) FROM vacancies', 'SELECT * FROM year_stats ORDER BY year',
+                 'SELECT * FROM city_stats ORDER BY area_name')]
+
+    def test_second_load_changes_nothing(self):
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare), 3)
+        state = self.get_state()
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare), 0)
+        self.assertEqual(self.get_state(), state)
+        self.assertEqual(self.prepared, [4, 1])
+        self.assertEqual(self.con.execute('PRAGMA journal_mode').fetchone()[0], 'delete')
+
+    def test_rows_dropped_by_keep_rows_are_not_prepared_again(self):
+        def has_salary(df):
+            return df['salary'].notna()
+
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare,
+                                             keep_rows=has_salary), 3)
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare,
+                                             keep_rows=has_salary), 0)
+        self.assertEqual(self.prepared, [3])
+
+    def test_reload_after_drop(self):
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare), 3)
+        state = self.get_state()
+        self.con.execute('DROP TABLE vacancies')
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare), 3)
+        self.assertEqual(self.get_state(), state)
+
+    def test_nothing_prepared_creates_no_table(self):
+        self.assertEqual(vacancy_db.load_csv(self.file_name, self.con, 'vacancies', self.prepare,
+                                             keep_rows=lambda df: df['salary'] < 0), 0)
+        self.assertEqual(vacancy_db.get_columns(self.con, 'vacancies'), [])
+
+
+class SqlStatTest(TestCase):
+    cities = ['Москва', 'Казань', 'Пермь', 'Омск', 'Тула', 'Сочи', 'Уфа', 'Орёл', 'Чита', 'Тверь', 'Курск',
+              'Псков', 'Томск', 'Ухта']
+
+    @classmethod
+    def setUpClass(cls):
+        file_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'new_stat_for_proj', 'sql_stat.py')
+        spec = importlib.util.spec_from_file_location('sql_stat', file_name)
+        cls.sql_stat = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.sql_stat)
+
+    def setUp(self):
+        rows = []
+        for k, city in enumerate(self.cities):
+            for j in range(k + 1):
+                rows.append(['Программист' if j % 2 else 'Аналитик', 1000.0 * (k * 5 % 14) + 10 * j, city,
+                             f'{2007 + (j + k) % 3}-03'])
+        self.rows = rows
+        self.con = sql.connect(':memory:')
+        self.addCleanup(self.con.close)
+        vacancies = vacancy_db.add_year_column(pd.DataFrame(rows, columns=['name', 'salary', 'area_name', 'date']))
+        vacancies.to_sql('vacancies', self.con, index=False)
+        vacancies[(vacancies['name'] == 'Программист') & (vacancies['year'] != 2008)] \
+            .to_sql('vacs_with_prof', self.con, index=False)
+        vacancy_db.create_summary_tables(self.con, 'vacancies')
+        vacancy_db.create_summary_tables(self.con, 'vacs_with_prof')
+
+    def test_year_report(self):
+        expected = {}
+        for name, salary, _, date in self.rows:
+            year = int(date[:4])
+            salaries = expected.setdefault(year, ([], []))
+            salaries[0].append(salary)
+            if name == 'Программист' and year != 2008:
+                salaries[1].append(salary)
+        report = self.sql_stat.get_year_report(self.con)
+        self.assertEqual(report.index.tolist(), sorted(expected))
+        for year, (salaries, salaries_vac) in expected.items():
+            self.assertEqual(report.loc[year, 'avg_salary'], math.floor(sum(salaries) / len(salaries) + 0.5))
+            self.assertEqual(report.loc[year, 'count'], len(salaries))
+            if salaries_vac:
+                self.assertEqual(report.loc[year, 'avg_salary_vac'],
+                                 math.floor(sum(salaries_vac) / len(salaries_vac) + 0.5))
+                self.assertEqual(report.loc[year, 'count_vac'], len(salaries_vac))
+            else:
+                self.assertTrue(np.isnan(report.loc[year, 'avg_salary_vac']))
+
+    def test_city_report(self):
+        salaries_by_city = {}
+        for _, salary, city, _ in self.rows:
+            salaries_by_city.setdefault(city, []).append(salary)
+        total = len(self.rows)
+        avg_by_city = {city: math.floor(sum(salaries) / len(salaries) + 0.5)
+                       for city, salaries in salaries_by_city.items() if len(salaries) > total * 0.01}
+        salary_top = sorted(avg_by_city.items(), key=lambda item: -item[1])[:10]
+        count_top = sorted(salaries_by_city, key=lambda city: -len(salaries_by_city[city]))[:10]
+        salary_by_city, count_by_city = self.sql_stat.get_city_report(self.con)
+        self.assertEqual(list(zip(salary_by_city['area_name'], salary_by_city['avg'])), salary_top)
+        self.assertEqual(count_by_city['area_name'].tolist(), count_top)
+        np.testing.assert_allclose(count_by_city['percent'],
+                                   [len(salaries_by_city[city]) / total for city in count_top], atol=1e-4)
+        self.assertNotIn('Москва', avg_by_city)
+
+
+class StubSession:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+        self.headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        self.headers.append(headers)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        response = requests.Response()
+        response.status_code, response._content = answer[0], answer[1]
+        response.headers.update(answer[2] if len(answer) > 2 else {})
+        return response
+
+    def close(self):
+        pass
+
+
+class HHClientRetryTest(TestCase):
+    def test_retry_timeout_and_retry_after(self):
+        with HHClient('http://stub', retries=3, backoff=0.5) as client:
+            client.session = StubSession([requests.ReadTimeout(), (429, b'', {'Retry-After': '3'}), (503, b''),
+                                          (200, b'{"items": []}')])
+            with patch('hh_client.time.sleep') as sleep:
+                self.assertEqual(client.get_json('/vacancies'), {'items': []})
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(client.session.calls, 4)
+        self.assertEqual(len(delays), 3)
+        self.assertTrue(0.5 <= delays[0] <= 0.75)
+        self.assertEqual(delays[1], 3.0)
+        self.assertTrue(2.0 <= delays[2] <= 3.0)
+
+    def test_raise_after_retries(self):
+        with HHClient('http://stub', retries=1) as client:
+            client.session = StubSession([(500, b''), (502, b'')])
+            with patch('hh_client.time.sleep'), self.assertRaises(requests.HTTPError):
+                client.get_content('/vacancies')
+            client.session = StubSession([requests.ReadTimeout(), requests.ReadTimeout()])
+            with patch('hh_client.time.sleep'), self.assertRaises(requests.Timeout):
+                client.get_content('/vacancies')
+
+
+class MapClient:
+    def map(self, function, items):
+        return list(map(function, items))
+
+
+class SplitWindowTest(TestCase):
+    date_from, date_to = datetime(2022, 12, 26), datetime(2022, 12, 27)
+
+    def test_windows_cover_period_and_respect_cap(self):
+        day = (self.date_to - self.date_from).total_seconds()
+        published = [self.date_from + timedelta(seconds=day * i / 5000) for i in range(5000)]
+        burst = datetime(2022, 12, 26, 15, 0, 0)
+        published += [burst + timedelta(seconds=i / 100) for i in range(3000)]
+        calls = []
+
+        def get_found(client, window):
+            calls.append(window)
+            return sum(window[0] <= time < window[1] for time in published)
+
+        with patch('load_vac_from_hh.get_found', side_effect=get_found):
+            windows = load_vac_from_hh.split_window(MapClient(), self.date_from, self.date_to)
+        self.assertEqual(windows[0][0], self.date_from)
+        self.assertEqual(windows[-1][1], self.date_to)
+        for (_, end, _), (start, _, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+        for start, end, count in windows:
+            self.assertTrue(count <= load_vac_from_hh.result_cap or end - start <= load_vac_from_hh.min_window)
+        self.assertTrue(any(count > load_vac_from_hh.result_cap for _, _, count in windows))
+        self.assertEqual(sum(count for _, _, count in windows), len(published))
+        self.assertLess(len(calls), 2 * len(windows))
+
+
+class HTTPCacheTest(TestCase):
+    def make_cache(self, **cache_args):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache = HTTPCache(os.path.join(directory, 'cache.sqlite'), **cache_args)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_ttl_freshness(self):
+        cache = self.make_cache(ttl=60)
+        with patch('http_cache.time.time', return_value=1000):
+            cache.put('http://stub/a', b'body', 'etag-a')
+        with patch('http_cache.time.time', return_value=1059):
+            self.assertEqual(cache.get('http://stub/a'), (b'body', 'etag-a', True))
+        with patch('http_cache.time.time', return_value=1061):
+            self.assertEqual(cache.get('http://stub/a'), (b'body', 'etag-a', False))
+        self.assertIsNone(cache.get('http://stub/b'))
+
+    def test_etag_not_modified_refresh(self):
+        cache = self.make_cache(ttl=0)
+        cache.put('http://stub/vacancies', b'{"found": 1}', 'etag-1')
+        with HHClient('http://stub', cache=cache) as client:
+            client.session = StubSession([(304, b'')])
+            self.assertEqual(client.get_json('/vacancies'), {'found': 1})
+            self.assertEqual(client.session.headers, [{'If-None-Match': 'etag-1'}])
+            cache.ttl = 60
+            self.assertTrue(cache.get('http://stub/vacancies')[2])
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(max_bytes=10)
+        with patch('http_cache.time.time', side_effect=itertools.count(1000)):
+            cache.put('a', b'1234')
+            cache.put('b', b'1234')
+            cache.get('a')
+            cache.put('c', b'1234')
+            self.assertIsNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('a'))
+            self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.total_bytes, 8)
+        cache.put('a', b'12')
+        self.assertEqual(cache.total_bytes, 6)
+
+
+class CBRRatesTest(TestCase):
+    daily = """<?xml version="1.0" encoding="windows-1251"?>
+<ValCurs Date="01.07.2016" name="Foreign Currency Market">
+<Valute ID="R01090B"><NumCode>933</NumCode><CharCode>BYN</CharCode><Nominal>1</Nominal>
+<Name>Белорусский рубль</Name><Value>32,1234</Value></Valute>
+<Valute ID="R01090"><NumCode>974</NumCode><CharCode>BYR</CharCode><Nominal>10000</Nominal>
+<Name>Белорусских рублей</Name><Value>32,0000</Value></Valute>
+<Valute ID="R01335"><NumCode>398</NumCode><CharCode>KZT</CharCode><Nominal>100</Nominal>
+<Name>Казахстанских тенге</Name><Value>19,0000</Value></Valute>
+<Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal>
+<Name>Доллар США</Name><Value>64,2575</Value></Valute>
+</ValCurs>""".encode('cp1251')
+
+    @staticmethod
+    def get_dynamic(currency_id, records):
+        rows = ''.join(f'<Record Date="{day}" Id="{currency_id}"><Nominal>{nominal}</Nominal><Value>{value}</Value>'
+                       f'</Record>' for day, nominal, value in records)
+        return (f'<?xml version="1.0" encoding="windows-1251"?><ValCurs ID="{currency_id}" '
+                f'name="Foreign Currency Market Dynamic">{rows}</ValCurs>').encode('cp1251')
+
+    def test_parse_daily_rates(self):
+        rates = parse_daily_rates(self.daily, ['BYR', 'KZT'])
+        self.assertEqual(set(rates), {'BYR', 'KZT'})
+        self.assertAlmostEqual(rates['BYR'], 32.1234 + 32 / 10000)
+        self.assertAlmostEqual(rates['KZT'], 0.19)
+
+    def test_parse_dynamic_rates(self):
+        content = self.get_dynamic('R01335', [('30.06.2016', 100, '18,8765'), ('01.07.2016', 100, '19,0000')])
+        rates = parse_dynamic_rates(content)
+        self.assertEqual(list(rates), ['2016-06-30', '2016-07-01'])
+        self.assertAlmostEqual(rates['2016-06-30'], 0.188765)
+
+    def test_fetch_currency_days_sums_byr_byn(self):
+        answers = {'R01090': self.get_dynamic('R01090', [('30.06.2016', 10000, '32,5000')]),
+                   'R01090B': self.get_dynamic('R01090B', [('01.07.2016', 1, '32,1234')])}
+
+        class Client:
+            def get_content(self, path, params):
+                return answers[params['VAL_NM_RQ']]
+
+        rates = fetch_currency_days(Client(), 'BYR', pd.Timestamp('2016-06-30'), pd.Timestamp('2016-07-01'))
+        self.assertEqual(set(rates), {'2016-06-30', '2016-07-01'})
+        self.assertAlmostEqual(rates['2016-06-30'], 0.00325)
+        self.assertAlmostEqual(rates['2016-07-01'], 32.1234)
+
+    def test_sync_daily_rates_is_incremental(self):
+        days = ['28.06.2016', '29.06.2016', '30.06.2016', '01.07.2016', '02.07.2016']
+        published = {'R01235': [(day, 1, f'6{i},0000') for i, day in enumerate(days)],
+                     'R01335': [(day, 100, f'1{i},0000') for i, day in enumerate(days) if day != '30.06.2016']}
+        get_dynamic = self.get_dynamic
+
+        class Client:
+            requests = []
+
+            def map(self, function, items):
+                return list(map(function, items))
+
+            def get_content(self, path, params):
+                currency_id, date_from, date_to = params['VAL_NM_RQ'], params['date_req1'], params['date_req2']
+                self.requests.append((currency_id, date_from, date_to))
+                date_from, date_to = (datetime.strptime(day, '%d/%m/%Y') for day in (date_from, date_to))
+                return get_dynamic(currency_id, [record for record in published[currency_id]
+                                                 if date_from <= datetime.strptime(record[0], '%d.%m.%Y') <= date_to])
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_name = os.path.join(directory, 'currencies_daily.csv')
+        sync_daily_rates(file_name, end='2016-06-30', start='2016-06-28', currencies=['USD', 'KZT'],
+                         client=Client())
+        self.assertEqual(sorted(Client.requests), [('R01235', '28/06/2016', '30/06/2016'),
+                                                   ('R01335', '28/06/2016', '30/06/2016')])
+        Client.requests.clear()
+        store = sync_daily_rates(file_name, end='2016-07-02', start='2016-06-28', currencies=['USD', 'KZT'],
+                                 client=Client())
+        self.assertEqual(sorted(Client.requests), [('R01235', '01/07/2016', '02/07/2016'),
+                                                   ('R01335', '30/06/2016', '02/07/2016')])
+        expected = pd.DataFrame({'USD': [60.0, 61.0, 62.0, 63.0, 64.0], 'KZT': [0.1, 0.11, np.nan, 0.13, 0.14]},
+                                index=pd.DatetimeIndex(pd.to_datetime(days, format='%d.%m.%Y'), name='date'))
+        pd.testing.assert_frame_equal(store[['USD', 'KZT']], expected)
+        pd.testing.assert_frame_equal(load_daily_rates(file_name)[['USD', 'KZT']], expected)
+
+
+class TextCleanerTest(TestCase):
+    def test_fast_path_returns_same_string(self):
+        value = 'Программист 1С (8.0)/Разработчик'
+        self.assertIs(clean_string(value), value)
+
+    def test_tags_removed(self):
+        self.assertEqual(clean_string('<p>Web <strong>developer</strong></p>'), 'Web developer')
+
+    def test_extra_whitespace(self):
+        self.assertEqual(clean_string('  Web \t developer  '), 'Web developer')
+        self.assertEqual(clean_string('Web  developer'), 'Web developer')
+
+    def test_multi_line_keeps_line_breaks(self):
+        self.assertEqual(clean_string('Python\n  Django'), 'Python\n  Django')
+        self.assertEqual(clean_string('<li>Python</li>\n<li>Django</li>'), 'Python\nDjango')
+
+    def test_clean_column(self):
+        self.assertEqual(clean_column(['<b>Москва</b>', 'Казань', ' Пермь ']), ['Москва', 'Казань', 'Пермь'])
+
+
+class DateParserTest(TestCase):
+    def test_get_year(self):
+        self.assertEqual(get_year('2007-12-04T11:27:27+0300'), 2007)
+
+    def test_get_date(self):
+        self.assertEqual(get_date('2007-12-04T11:27:27+0300'), '04.12.2007')
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            parse_published_at('2007-12-04 11:27:27')
+
+
+class CurrencyConvertTest(TestCase):
+    def setUp(self):
+        self.currency_data = pd.DataFrame({'USD': [30.0, 31.0], 'EUR': [40.0, None]},
+                                          index=pd.Index(['2003-01', '2003-02'], name='date'))
+
+    def test_convert_by_month(self):
+        df = pd.DataFrame({'salary': [100.0, 100.0, 500.0], 'salary_currency': ['USD', 'USD', 'RUR'],
+                           'date': ['2003-01', '2003-02', '2003-02']})
+        self.assertEqual(convert_salary(df, self.currency_data).tolist(), [3000.0, 3100.0, 500.0])
+
+    def test_missing_rate_is_nan(self):
+        df = pd.DataFrame({'salary': [100.0], 'salary_currency': ['EUR'], 'date': ['2003-02']})
+        self.assertTrue(convert_salary(df, self.currency_data).isna().all())
+
+    def test_convert_by_day_asof(self):
+        daily_rates = pd.DataFrame({'USD': [30.0, 32.0]},
+                                   index=pd.DatetimeIndex(['2003-01-10', '2003-01-14'], name='date'))
+        df = pd.DataFrame({'salary': [100.0, 100.0, 100.0, 500.0], 'salary_currency': ['USD', 'USD', 'USD', 'RUR'],
+                           'date': ['2003-01'] * 4,
+                           'published_at': ['2003-01-09T10:00:00+0300', '2003-01-12T10:00:00+0300',
+                                            '2003-01-14T10:00:00+0300', '2003-01-12T10:00:00+0300']})
+        result = convert_salary(df, self.currency_data, daily_rates=daily_rates)
+        self.assertTrue(np.isnan(result.iloc[0]))
+        self.assertEqual(result.iloc[1:].tolist(), [3000.0, 3200.0, 500.0])
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
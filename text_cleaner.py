@@ -0,0 +1,40 @@
+import re
+from typing import Iterable, List
+
+html_tag = re.compile('<.*?>')
+
+
+def clean_string(raw: str) -> str:
+    """Очищает строку от html тэгов и лишних пробелов. Строки без '<', без двойных пробелов
+     и без других пробельных символов возвращаются без обработки регулярным выражением
+
+    Args:
+        raw (str): значение поля csv файла
+
+    Returns:
+        str: строка без лишних пробелов и html тэгов, многострочные строки сохраняют переносы
+
+    >>> clean_string("<strong>Программист 1С (8.0)/Разработчик</strong>")
+    'Программист 1С (8.0)/Разработчик'
+    >>> clean_string("  Программист      1С (8.0)/Разработчик")
+    'Программист 1С (8.0)/Разработчик'
+    """
+    if '<' not in raw:
+        if '  ' not in raw and raw.isprintable() and raw[:1] != ' ' and raw[-1:] != ' ':
+            return raw
+        return raw if '\n' in raw else " ".join(raw.split())
+    result = html_tag.sub('', raw)
+    return result if '\n' in raw else " ".join(result.split())
+
+
+def clean_column(values: Iterable[str]) -> List[str]:
+    """Очищает целый столбец значений
+
+    Args:
+        values (Iterable[str]): значения одного столбца
+
+    Returns:
+        List[str]: очищенные значения в том же порядке
+    """
+    return [clean_string(value) for value in values]
+
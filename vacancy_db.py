@@ -0,0 +1,277 @@
+import hashlib
+import sqlite3 as sql
+import time
+from typing import Callable, Optional
+
+import pandas as pd
+
+db_name = 'vacancy_db'
+chunk_size = 100_000
+key_fields = ('name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency')
+bulk_pragmas = {'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -256 * 1024, 'temp_store': 'MEMORY'}
+indexed_columns = ('year', 'area_name', 'name')
+summary_tables = {'vacancies': (('year_stats', 'year', 'INTEGER'), ('city_stats', 'area_name', 'TEXT')),
+                  'vacs_with_prof': (('profession_year_stats', 'year', 'INTEGER'),)}
+
+
+def get_columns(con: sql.Connection, table: str) -> list:
+    """Возвращает названия столбцов таблицы, пустой список если таблицы нет"""
+    return [row[1] for row in con.execute(f'PRAGMA table_info("{table}")')]
+
+
+def add_year_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Добавляет в DataFrame целочисленный столбец year, вычисленный из даты гггг-мм
+
+    Args:
+        df (pd.DataFrame): вакансии со столбцом date
+
+    Returns:
+        pd.DataFrame: тот же DataFrame со столбцом year
+    """
+    df['year'] = df['date'].str[:4].astype(int)
+    return df
+
+
+def migrate_year_column(con: sql.Connection, table: str) -> None:
+    """Добавляет столбец year в уже существующую таблицу, созданную без него, и заполняет его из date"""
+    columns = get_columns(con, table)
+    if columns and 'year' not in columns:
+        con.execute(f'ALTER TABLE "{table}" ADD COLUMN year INTEGER')
+        con.execute(f'UPDATE "{table}" SET year = CAST(SUBSTR(date, 1, 4) AS INTEGER)')
+        con.commit()
+
+
+def create_indexes(con: sql.Connection, table: str) -> None:
+    """Создаёт индексы по year, area_name и name и обновляет статистику планировщика (ANALYZE)
+
+    Args:
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы вакансий
+    """
+    for column in indexed_columns:
+        con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{column}" ON "{table}" ({column})')
+    con.execute(f'ANALYZE "{table}"')
+    con.commit()
+
+
+def create_summary_tables(con: sql.Connection, table: str) -> None:
+    """Создаёт сводные таблицы для таблицы вакансий (summary_tables) и заполняет их по уже загруженным вакансиям,
+     дальше они обновляются только добавленными строками. Существующая сводная таблица пересчитывается заново,
+     если количество строк в ней не совпадает с таблицей вакансий (например, таблицу вакансий удалили
+     и загружают заново)
+
+    Args:
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы вакансий
+    """
+    migrate_year_column(con, table)
+    rows_count = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] if get_columns(con, table) else 0
+    for summary, key, key_type in summary_tables.get(table, ()):
+        if get_columns(con, summary):
+            if con.execute(f'SELECT TOTAL(rows_count) FROM "{summary}"').fetchone()[0] == rows_count:
+                continue
+            con.execute(f'DROP TABLE "{summary}"')
+        con.execute(f'CREATE TABLE "{summary}" ({key} {key_type} PRIMARY KEY, salary_sum REAL, '
+                    f'salary_count INTEGER, rows_count INTEGER)')
+        if rows_count:
+            con.execute(f'INSERT INTO "{summary}" SELECT {key}, TOTAL(salary), COUNT(salary), COUNT(*) '
+                        f'FROM "{table}" GROUP BY {key}')
+    con.commit()
+
+
+def update_summary_tables(con: sql.Connection, table: str, source: str) -> None:
+    """Добавляет к сводным таблицам суммы и количества только по новым вакансиям из таблицы source (UPSERT),
+     затрагиваются лишь те годы и города, которые есть в source
+
+    Args:
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы вакансий
+        source (str): таблица с новыми вакансиями
+    """
+    for summary, key, _ in summary_tables.get(table, ()):
+        con.execute(f'INSERT INTO "{summary}" SELECT {key}, TOTAL(salary), COUNT(salary), COUNT(*) '
+                    f'FROM "{source}" WHERE true GROUP BY {key} ON CONFLICT({key}) DO UPDATE SET '
+                    f'salary_sum = salary_sum + excluded.salary_sum, '
+                    f'salary_count = salary_count + excluded.salary_count, '
+                    f'rows_count = rows_count + excluded.rows_count')
+
+
+def get_sql_type(dtype) -> str:
+    """Возвращает тип столбца SQLite для типа столбца pandas"""
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def get_vacancy_keys(df: pd.DataFrame) -> pd.Series:
+    """Возвращает ключ каждой вакансии для исключения повторной загрузки: 'hh:<id>', если в csv есть id,
+     иначе sha1 от полей key_fields
+
+    Args:
+        df (pd.DataFrame): часть csv файла до преобразования
+
+    Returns:
+        pd.Series: ключи вакансий с тем же индексом, что и df
+    """
+    fields = df.reindex(columns=list(key_fields)).astype(str)
+    joined = fields[key_fields[0]].str.cat([fields[field] for field in key_fields[1:]], sep='|', na_rep='')
+    keys = joined.map(lambda value: hashlib.sha1(value.encode('utf-8')).hexdigest())
+    if 'id' in df:
+        ids = pd.to_numeric(df['id'], errors='coerce').astype('Int64')
+        keys = keys.where(ids.isna(), 'hh:' + ids.astype(str))
+    return keys
+
+
+def create_ingested_keys(con: sql.Connection, table: str) -> None:
+    """Создаёт таблицу ingested_keys с ключами уже обработанных строк csv для каждой таблицы вакансий:
+     записанных в таблицу и отброшенных навсегда. Для таблицы, загруженной до появления ingested_keys,
+     в неё переносятся ключи уже записанных вакансий. Если таблицы вакансий нет или она пуста
+     (например, её удалили, чтобы загрузить заново), ключи для неё удаляются
+
+    Args:
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы вакансий
+    """
+    con.execute('CREATE TABLE IF NOT EXISTS ingested_keys (target TEXT, vacancy_key TEXT, '
+                'PRIMARY KEY (target, vacancy_key)) WITHOUT ROWID')
+    columns = get_columns(con, table)
+    if not columns or not con.execute(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone():
+        con.execute('DELETE FROM ingested_keys WHERE target = ?', (table,))
+    has_keys = con.execute('SELECT 1 FROM ingested_keys WHERE target = ? LIMIT 1', (table,)).fetchone()
+    if not has_keys and 'vacancy_key' in columns:
+        con.execute(f'INSERT OR IGNORE INTO ingested_keys SELECT ?, vacancy_key FROM "{table}" '
+                    f'WHERE vacancy_key IS NOT NULL', (table,))
+    con.commit()
+
+
+def get_new_rows(keys: pd.Series, con: sql.Connection, table: str) -> pd.Series:
+    """Возвращает маску строк, ключей которых ещё нет в ingested_keys, чтобы не преобразовывать
+     уже обработанные строки: ни загруженные, ни отброшенные навсегда
+
+    Args:
+        keys (pd.Series): ключи вакансий части csv файла
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы
+
+    Returns:
+        pd.Series: True для новых вакансий
+    """
+    con.execute('CREATE TEMP TABLE IF NOT EXISTS chunk_keys (vacancy_key TEXT)')
+    con.execute('DELETE FROM chunk_keys')
+    con.executemany('INSERT INTO chunk_keys VALUES (?)', zip(keys.tolist()))
+    known = [row[0] for row in con.execute('SELECT vacancy_key FROM chunk_keys WHERE vacancy_key IN '
+                                           '(SELECT vacancy_key FROM ingested_keys WHERE target = ?)', (table,))]
+    return ~keys.isin(known)
+
+
+def mark_ingested(keys: pd.Series, con: sql.Connection, table: str) -> None:
+    """Записывает ключи обработанных строк в ingested_keys, в той же транзакции, что и сами вакансии"""
+    con.executemany('INSERT OR IGNORE INTO ingested_keys VALUES (?, ?)', ((table, key) for key in keys.tolist()))
+
+
+def insert_vacancies(df: pd.DataFrame, con: sql.Connection, table: str) -> int:
+    """Вставляет новые вакансии через промежуточную временную таблицу: строки пишутся в неё подготовленным
+     запросом через executemany, из неё удаляются вакансии с уже известным vacancy_key и повторы внутри df,
+     по оставшимся обновляются сводные таблицы, затем они переносятся INSERT OR IGNORE.
+     Индекс df пишется в столбец index, как у DataFrame.to_sql. Если таблицы или столбцов df в ней нет,
+     они создаются по типам столбцов df, на vacancy_key создаётся уникальный индекс
+
+    Args:
+        df (pd.DataFrame): вакансии со столбцом vacancy_key
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы
+
+    Returns:
+        int: количество добавленных строк
+    """
+    columns = ['index'] + list(df.columns)
+    types = ['INTEGER'] + [get_sql_type(dtype) for dtype in df.dtypes]
+    names = ', '.join(f'"{column}"' for column in columns)
+    existing = get_columns(con, table)
+    if not existing:
+        definitions = ', '.join(f'"{column}" {column_type}' for column, column_type in zip(columns, types))
+        con.execute(f'CREATE TABLE "{table}" ({definitions})')
+    for column, column_type in zip(columns, types):
+        if existing and column not in existing:
+            con.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {column_type}')
+    con.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table}_vacancy_key" ON "{table}" (vacancy_key)')
+    staging = f'staging_{table}'
+    con.execute(f'DROP TABLE IF EXISTS temp."{staging}"')
+    con.execute(f'CREATE TEMP TABLE "{staging}" AS SELECT {names} FROM "{table}" WHERE 0')
+    values = df.reset_index().astype(object)
+    values = values.where(values.notna(), None)
+    con.executemany(f'INSERT INTO "{staging}" ({names}) VALUES ({", ".join("?" * len(columns))})',
+                    values.itertuples(index=False, name=None))
+    con.execute(f'DELETE FROM "{staging}" WHERE vacancy_key IN (SELECT vacancy_key FROM "{table}") '
+                f'OR rowid NOT IN (SELECT MIN(rowid) FROM "{staging}" GROUP BY vacancy_key)')
+    update_summary_tables(con, table, staging)
+    inserted = con.execute(f'INSERT OR IGNORE INTO "{table}" ({names}) SELECT {names} FROM "{staging}"').rowcount
+    con.execute(f'DROP TABLE temp."{staging}"')
+    return inserted
+
+
+def get_pragmas(con: sql.Connection, pragmas) -> dict:
+    """Возвращает текущие значения настроек соединения SQLite (PRAGMA)"""
+    return {pragma: con.execute(f'PRAGMA {pragma}').fetchone()[0] for pragma in pragmas}
+
+
+def set_pragmas(con: sql.Connection, pragmas: dict) -> None:
+    """Устанавливает настройки соединения SQLite (PRAGMA)"""
+    for pragma, value in pragmas.items():
+        con.execute(f'PRAGMA {pragma} = {value}')
+
+
+def load_csv(file_name: str, con: sql.Connection, table: str,
+             prepare: Callable[[pd.DataFrame], pd.DataFrame],
+             keep_rows: Optional[Callable[[pd.DataFrame], pd.Series]] = None, **read_csv_args) -> int:
+    """Потоково загружает csv файл в таблицу: читает его частями по chunk_size строк, преобразует каждую часть
+     функцией prepare и записывает её в отдельной транзакции вместе с обновлением сводных таблиц.
+     Строки, уже обработанные раньше (по ключу get_vacancy_keys в ingested_keys), не преобразуются повторно:
+     обработанными считаются записанные строки и строки, отброшенные keep_rows. Строки, которые отбросил
+     prepare (например, из-за отсутствующего курса валюты), будут обработаны снова при следующем запуске.
+     На время загрузки включаются bulk_pragmas, после неё возвращаются прежние значения (в том числе journal_mode),
+     индексы создаются один раз в конце, выводится скорость загрузки
+
+    Args:
+        file_name (str): название файла csv
+        con (sql.Connection): соединение с базой данных
+        table (str): название таблицы
+        prepare (Callable[[pd.DataFrame], pd.DataFrame]): преобразование части csv в строки таблицы
+            (со столбцом date в формате гггг-мм)
+        keep_rows (Callable[[pd.DataFrame], pd.Series]): маска строк части csv, которые нужно преобразовать;
+            остальные строки отбрасываются навсегда, поэтому она должна зависеть только от самой строки
+        read_csv_args: дополнительные аргументы pd.read_csv
+
+    Returns:
+        int: количество добавленных строк
+    """
+    previous_pragmas = get_pragmas(con, bulk_pragmas)
+    set_pragmas(con, bulk_pragmas)
+    try:
+        create_summary_tables(con, table)
+        create_ingested_keys(con, table)
+        start, read_count, rows_count = time.perf_counter(), 0, 0
+        for chunk in pd.read_csv(file_name, chunksize=chunk_size, **read_csv_args):
+            read_count += len(chunk)
+            keys = get_vacancy_keys(chunk)
+            with con:
+                new_rows = get_new_rows(keys, con, table)
+            if new_rows.any():
+                chunk = chunk[new_rows]
+                kept = keep_rows(chunk) if keep_rows else pd.Series(True, index=chunk.index)
+                df = prepare(chunk[kept]) if kept.any() else chunk.iloc[:0]
+                with con:
+                    if len(df):
+                        df = add_year_column(df)
+                        df['vacancy_key'] = keys[df.index]
+                        rows_count += insert_vacancies(df, con, table)
+                    mark_ingested(keys[kept.index[~kept].union(df.index)], con, table)
+            seconds = time.perf_counter() - start
+            print(f'{table}: прочитано {read_count} строк, добавлено {rows_count}, {read_count / seconds:.0f} строк/с')
+        if get_columns(con, table):
+            create_indexes(con, table)
+    finally:
+        set_pragmas(con, previous_pragmas)
+    return rows_count